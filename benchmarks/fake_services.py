@@ -0,0 +1,106 @@
+"""
+Doublures locales de Gemini, Vera et des sites web liés (sans réseau)
+
+Chaque doublure peut injecter une latence, des erreurs et des 429 pour
+reproduire un service externe dégradé.
+"""
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+
+from google.api_core.exceptions import InternalServerError, ResourceExhausted
+
+from benchmarks.fake_telegram import FakeHTTPServer
+
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeGeminiModel:
+    """Remplace `genai.GenerativeModel` : répond du JSON plausible à chaque prompt"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.3, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls: Counter = Counter()
+
+    async def generate_content_async(self, contents) -> FakeGeminiResponse:
+        prompt = contents if isinstance(contents, str) else next(
+            (part for part in contents if isinstance(part, str)), "")
+        self.calls["generate"] += 1
+        await asyncio.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+        draw = random.random()
+        if draw < self.rate_limit_rate:
+            self.calls["429"] += 1
+            raise ResourceExhausted("Quota exceeded (fake)")
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.calls["500"] += 1
+            raise InternalServerError("Internal error (fake)")
+
+        batch = re.search(r"tableau de (\d+) objets", prompt)
+        if batch:
+            return FakeGeminiResponse(json.dumps([self._result(i) for i in range(int(batch.group(1)))]))
+        return FakeGeminiResponse(json.dumps(self._result(0)))
+
+    def _result(self, index: int) -> dict:
+        claim = f"Affirmation vérifiable numéro {random.randint(1, 50)}"
+        return {"id": index, "summary": "Contenu de test", "claims": [claim],
+                "claim_type": "factual", "extracted_text": claim, "transcription": claim}
+
+class FakeVeraAPI(FakeHTTPServer):
+    """Imitation de l'API Vera (verdict texte)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 1.0,
+                 jitter: float = 0.5, error_rate: float = 0.0, rate_limit_rate: float = 0.0):
+        super().__init__(host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls: Counter = Counter()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v1/chat"
+
+    async def route(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, bytes, str]:
+        self.calls["verify"] += 1
+        await asyncio.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+        draw = random.random()
+        if draw < self.rate_limit_rate:
+            self.calls["429"] += 1
+            return 429, b'{"error": "rate limited"}', "application/json"
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.calls["500"] += 1
+            return 500, b'{"error": "internal"}', "application/json"
+
+        query = json.loads(body or b"{}").get("query", "")
+        verdict = f"✅ Plutôt vrai : « {query[:80]} » est confirmé par plusieurs sources (fake)."
+        return 200, verdict.encode(), "text/plain; charset=utf-8"
+
+class FakeWebSite(FakeHTTPServer):
+    """Pages HTML servies pour les liens"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.1):
+        super().__init__(host, port)
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    def page_url(self, index: int) -> str:
+        return f"http://{self.host}:{self.port}/article/{index}?utm_source=telegram"
+
+    async def route(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, bytes, str]:
+        self.calls["page"] += 1
+        await asyncio.sleep(self.latency)
+        paragraphs = "".join(f"<p>Paragraphe {i} de l'article {target} : la Terre tourne autour du "
+                             f"Soleil en 365 jours.</p>" for i in range(20))
+        html = (f"<html><head><title>Article {target}</title></head><body><nav>Menu</nav>"
+                f"<article>{paragraphs}</article><footer>Pied</footer></body></html>")
+        return 200, html.encode(), "text/html; charset=utf-8"
@@ -0,0 +1,166 @@
+"""
+Faux serveur Bot API Telegram (local, sans réseau)
+
+Répond aux méthodes utilisées par le bot (getMe, setWebhook, sendMessage,
+editMessageText, getFile...) et compte les appels reçus. Latence, erreurs
+500 et 429 (RetryAfter) peuvent être injectées sur les appels d'API.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Optional
+from urllib.parse import parse_qs
+
+class FakeHTTPServer:
+    """Serveur HTTP/1.1 minimal (keep-alive) dont `route` est surchargée"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, value = line.decode().split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload, content_type = await self.route(method, target, headers, body)
+                writer.write(
+                    f"HTTP/1.1 {status} OK\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, bytes, str]:
+        """Répond à une requête : (statut, corps, Content-Type)"""
+        return 404, b"not found", "text/plain"
+
+class FakeTelegramAPI(FakeHTTPServer):
+    """Imitation de l'API Bot Telegram"""
+
+    # Méthodes jamais perturbées (démarrage du bot)
+    STARTUP_METHODS = {"getMe", "setWebhook", "deleteWebhook", "getUpdates"}
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: int = 1):
+        super().__init__(host, port)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.calls: Counter = Counter()
+        self.webhook_set = asyncio.Event()
+        self.replies = 0
+        self.last_reply_at: Optional[float] = None
+        self.files: dict[str, bytes] = {}
+        self.last_text: dict[int, str] = {}  # dernier texte envoyé/édité par chat
+        self._message_id = 0
+
+    @property
+    def base_url(self) -> str:
+        """Valeur de TELEGRAM_API_BASE_URL pour le bot"""
+        return f"http://{self.host}:{self.port}/bot"
+
+    @property
+    def base_file_url(self) -> str:
+        """Valeur de TELEGRAM_FILE_BASE_URL pour le bot"""
+        return f"http://{self.host}:{self.port}/file/bot"
+
+    async def route(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, bytes, str]:
+        """Répond à une requête (surchargé par les harnais de test)"""
+        if target.startswith("/file/"):
+            self.calls["download"] += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return 200, self.file_content(target), "application/octet-stream"
+
+        api_method = target.rsplit("/", 1)[-1]
+        params = self.parse_params(headers, body)
+        self.calls[api_method] += 1
+
+        if api_method not in self.STARTUP_METHODS:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            draw = random.random()
+            if draw < self.rate_limit_rate:
+                self.calls["429"] += 1
+                return 429, json.dumps({
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }).encode(), "application/json"
+            if draw < self.rate_limit_rate + self.error_rate:
+                self.calls["500"] += 1
+                return 500, json.dumps({"ok": False, "error_code": 500,
+                                        "description": "Internal Server Error"}).encode(), "application/json"
+
+        result = self.api_result(api_method, params)
+        return 200, json.dumps({"ok": True, "result": result}).encode(), "application/json"
+
+    def parse_params(self, headers: dict, body: bytes) -> dict:
+        if not body:
+            return {}
+        content_type = headers.get("content-type", "")
+        if content_type.startswith("application/json"):
+            return json.loads(body)
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        return {}
+
+    def api_result(self, api_method: str, params: dict):
+        if api_method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot",
+                    "can_join_groups": True, "can_read_all_group_messages": False,
+                    "supports_inline_queries": False}
+        if api_method == "setWebhook":
+            self.webhook_set.set()
+            return True
+        if api_method in ("sendMessage", "editMessageText"):
+            self.replies += 1
+            self.last_reply_at = time.monotonic()
+            self._message_id += 1
+            chat_id = int(params.get("chat_id", 0))
+            self.last_text[chat_id] = params.get("text", "")
+            return {"message_id": self._message_id, "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")}
+        if api_method == "getFile":
+            file_id = params.get("file_id", "file")
+            size = len(self.files[file_id]) if file_id in self.files else 1024
+            return {"file_id": file_id, "file_unique_id": file_id, "file_size": size,
+                    "file_path": f"files/{file_id}"}
+        if api_method == "getUpdates":
+            return []
+        return True
+
+    def file_content(self, target: str) -> bytes:
+        file_id = target.rsplit("/", 1)[-1]
+        if file_id in self.files:
+            return self.files[file_id]
+        return b"\xff\xd8\xff" + b"\x00" * 1021
@@ -0,0 +1,241 @@
+"""
+Test de charge hors ligne de `handle_message`
+
+Démarre des doublures locales de Telegram, Vera et des sites liés, remplace
+le modèle Gemini par une doublure, puis envoie des updates synthétiques de
+chaque type (texte, lien, photo, vidéo, vocal, audio, document) au vrai
+`handle_message`. Aucun appel réseau externe.
+
+Rapporte le débit, les latences p50/p95/p99 (global et par type), les
+réponses en erreur et le pic mémoire.
+
+Usage:
+    python -m benchmarks.load_test --updates 500 --concurrency 50 \\
+        --gemini-latency 0.8 --vera-latency 1.5 --vera-429 0.05 --telegram-429 0.02
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import resource
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+# Valeurs factices : la configuration est lue à l'import de `main`
+for key, value in {"TELEGRAM_BOT_TOKEN": "123456:LOADTEST", "GEMINI_API_KEY": "fake",
+                   "VERA_API_URL": "http://127.0.0.1:9/api/v1/chat", "VERA_API_KEY": "fake",
+                   "LOG_LEVEL": "WARNING", "METRICS_PORT": "0"}.items():
+    os.environ.setdefault(key, value)
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+import main
+from benchmarks.fake_services import FakeGeminiModel, FakeVeraAPI, FakeWebSite
+from benchmarks.fake_telegram import FakeTelegramAPI
+from config.settings import settings
+from services.gemini_client import GeminiClient
+from services.metrics import metrics
+from services.url_fetcher import UrlFetcher
+from services.vera_client import VeraClient
+
+CONTENT_TYPES = ("texte", "lien", "photo", "video", "vocal", "audio", "document")
+
+FACTUAL_TEXTS = [
+    "Selon l'INSEE, le chômage en France est passé à 7,3 % en 2023.",
+    "La tour Eiffel mesure 330 mètres et a été construite en 1889.",
+    "Le vaccin contre la grippe réduit de 40 % le risque d'hospitalisation selon l'OMS.",
+    "Paris a accueilli les Jeux olympiques en 1900, 1924 et 2024.",
+]
+SMALL_TALK = ["merci", "salut !", "ok"]
+
+def make_jpeg(width: int = 2400, height: int = 1800) -> bytes:
+    """JPEG réaliste (dégradé) pour exercer la préparation d'image"""
+    from PIL import Image
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=95)
+    return output.getvalue()
+
+def make_docx() -> bytes:
+    import docx
+
+    document = docx.Document()
+    for text in FACTUAL_TEXTS * 10:
+        document.add_paragraph(text)
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+def register_files(api: FakeTelegramAPI) -> None:
+    """Fichiers servis par le faux Telegram (identifiants fixes par type)"""
+    api.files["photo"] = make_jpeg()
+    api.files["video"] = os.urandom(512 * 1024)
+    api.files["voice"] = os.urandom(64 * 1024)
+    api.files["audio"] = os.urandom(256 * 1024)
+    api.files["document_txt"] = ("\n".join(FACTUAL_TEXTS * 50)).encode()
+    api.files["document_docx"] = make_docx()
+
+def make_update(update_id: int, content_type: str, site: FakeWebSite, api: FakeTelegramAPI) -> dict:
+    """Update Telegram synthétique du type demandé (un chat par update)"""
+    chat_id = 10_000 + update_id
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+    }
+
+    def media(file_id: str, **extra) -> dict:
+        return {"file_id": file_id, "file_unique_id": f"{file_id}-{update_id}",
+                "file_size": len(api.files[file_id]), **extra}
+
+    if content_type == "texte":
+        message["text"] = random.choice(SMALL_TALK if random.random() < 0.1 else FACTUAL_TEXTS)
+    elif content_type == "lien":
+        urls = " ".join(site.page_url(random.randint(1, 20)) for _ in range(random.randint(1, 3)))
+        message["text"] = f"Vu sur le web : {urls}"
+    elif content_type == "photo":
+        message["photo"] = [media("photo", width=2400, height=1800)]
+    elif content_type == "video":
+        message["video"] = media("video", width=640, height=360, duration=12, mime_type="video/mp4")
+    elif content_type == "vocal":
+        message["voice"] = media("voice", duration=8, mime_type="audio/ogg")
+    elif content_type == "audio":
+        message["audio"] = media("audio", duration=30, mime_type="audio/mpeg")
+    elif content_type == "document":
+        if random.random() < 0.5:
+            message["document"] = media("document_txt", file_name="note.txt", mime_type="text/plain")
+        else:
+            message["document"] = media(
+                "document_docx", file_name="note.docx",
+                mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    return {"update_id": update_id, "message": message}
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+def format_latencies(values: list[float]) -> str:
+    return (f"p50 {percentile(values, 50) * 1000:7.0f} ms  p95 {percentile(values, 95) * 1000:7.0f} ms  "
+            f"p99 {percentile(values, 99) * 1000:7.0f} ms")
+
+async def run(args: argparse.Namespace) -> None:
+    api = FakeTelegramAPI(latency=args.telegram_latency, error_rate=args.telegram_errors,
+                          rate_limit_rate=args.telegram_429)
+    vera = FakeVeraAPI(latency=args.vera_latency, jitter=args.vera_latency / 2,
+                       error_rate=args.vera_errors, rate_limit_rate=args.vera_429)
+    site = FakeWebSite(latency=args.site_latency)
+    for server in (api, vera, site):
+        await server.start()
+    register_files(api)
+
+    settings.telegram_api_base_url = api.base_url
+    settings.telegram_file_base_url = api.base_file_url
+    settings.temp_download_path.mkdir(parents=True, exist_ok=True)
+
+    # Clients réels, seuls les services distants sont remplacés (le faux site
+    # écoute sur 127.0.0.1 : adresses internes autorisées pour le fetcher)
+    model = FakeGeminiModel(latency=args.gemini_latency, jitter=args.gemini_latency / 2,
+                            error_rate=args.gemini_errors, rate_limit_rate=args.gemini_429)
+    main.gemini_client = GeminiClient(settings.gemini_api_key, settings.gemini_model,
+                                      settings.gemini_max_concurrency,
+                                      batch_window_ms=settings.gemini_batch_window_ms,
+                                      batch_max_items=settings.gemini_batch_max_items,
+                                      chunk_chars=settings.gemini_chunk_chars,
+                                      chunk_overlap=settings.gemini_chunk_overlap,
+                                      max_chunks=settings.gemini_max_chunks,
+                                      url_fetcher=UrlFetcher(settings.url_fetch_timeout,
+                                                             settings.url_fetch_max_bytes,
+                                                             settings.url_fetch_max_connections,
+                                                             settings.url_cache_max_entries,
+                                                             settings.url_fetch_max_redirects,
+                                                             settings.url_max_chars,
+                                                             allow_private=True))
+    main.gemini_client.model = model
+    main.vera_client = VeraClient(vera.url, settings.vera_api_key, settings.vera_timeout,
+                                  http2=False, max_connections=settings.vera_max_connections,
+                                  max_keepalive_connections=settings.vera_max_keepalive_connections)
+
+    app = main.build_application(with_updater=False)
+    await app.initialize()
+
+    types = [t for t in CONTENT_TYPES if t in args.types]
+    updates = [(i, random.choice(types)) for i in range(1, args.updates + 1)]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    outcomes: Counter = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def drive(update_id: int, content_type: str) -> None:
+        update = Update.de_json(make_update(update_id, content_type, site, api), app.bot)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await main.handle_message(update, CallbackContext.from_update(update, app))
+            except Exception as e:
+                outcomes[f"exception {type(e).__name__}"] += 1
+                reply = None
+            else:
+                reply = api.last_text.get(update.effective_chat.id, "")
+            latencies[content_type].append(time.perf_counter() - started)
+        if reply is not None:
+            outcomes["erreur" if reply.startswith("❌") else "ok" if reply else "sans réponse"] += 1
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(drive(i, t) for i, t in updates))
+    elapsed = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+
+    await app.shutdown()
+    await main.post_shutdown(app)
+    for server in (api, vera, site):
+        await server.stop()
+
+    everything = [value for values in latencies.values() for value in values]
+    print(f"\n{len(everything)} updates en {elapsed:.1f} s, concurrence {args.concurrency}")
+    print(f"Débit      : {len(everything) / elapsed:.1f} updates/s")
+    print(f"Global     : {format_latencies(everything)}")
+    for content_type in types:
+        if latencies[content_type]:
+            print(f"{content_type:<10} : {format_latencies(latencies[content_type])}  "
+                  f"(n={len(latencies[content_type])})")
+    print(f"Résultats  : {dict(outcomes)}")
+    print(f"Refus      : {dict((k[0], v) for k, v in metrics.rejections.values.items())}")
+    print(f"Telegram   : {dict(api.calls)}")
+    print(f"Gemini     : {dict(model.calls)}")
+    print(f"Vera       : {dict(vera.calls)}")
+    print(f"Sites      : {dict(site.calls)}")
+    # ru_maxrss est en Ko sous Linux
+    print(f"Mémoire    : pic RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB"
+          + (f", pic Python (tracemalloc) {traced_peak / 1024 / 1024:.0f} MB" if traced_peak else ""))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--types", nargs="+", default=list(CONTENT_TYPES), choices=CONTENT_TYPES)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tracemalloc", action="store_true", help="Mesure aussi le pic d'allocations Python")
+    parser.add_argument("--telegram-latency", type=float, default=0.05)
+    parser.add_argument("--telegram-errors", type=float, default=0.0)
+    parser.add_argument("--telegram-429", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.8)
+    parser.add_argument("--gemini-errors", type=float, default=0.0)
+    parser.add_argument("--gemini-429", type=float, default=0.0)
+    parser.add_argument("--vera-latency", type=float, default=1.5)
+    parser.add_argument("--vera-errors", type=float, default=0.0)
+    parser.add_argument("--vera-429", type=float, default=0.0)
+    parser.add_argument("--site-latency", type=float, default=0.1)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    random.seed(arguments.seed)
+    asyncio.run(run(arguments))
@@ -0,0 +1,88 @@
+"""
+Blocage de la boucle d'événements par le logging : synchrone vs file d'attente
+
+Des coroutines loguent en continu pendant qu'une sonde mesure le retard de
+réveil d'un `asyncio.sleep` périodique. La console est simulée par un flux
+lent (terminal, pipe saturé) ; le fichier de log est réellement écrit.
+
+Usage:
+    python -m benchmarks.logging_stall --seconds 3 --writers 20 --write-latency-ms 0.2
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+class SlowStream:
+    """Flux console dont chaque écriture bloque quelques dixièmes de ms"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+
+    def write(self, data: str) -> int:
+        time.sleep(self.latency)
+        self.writes += 1
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+async def probe(lags: list[float], stop: asyncio.Event, interval: float = 0.005) -> None:
+    """Mesure le retard de chaque réveil par rapport à l'intervalle demandé"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+async def writer(logger, stop: asyncio.Event, counter: list[int], interval: float = 0.002) -> None:
+    """Débit fixe (un log toutes les `interval` s) pour comparer les deux modes à charge égale"""
+    while not stop.is_set():
+        logger.info(f"Analyse de texte pour user {counter[0]}")
+        counter[0] += 1
+        await asyncio.sleep(interval)
+
+async def run(use_queue: bool, seconds: float, writers: int, latency: float, log_dir: Path) -> dict:
+    stream = SlowStream(latency)
+    logger = setup_logger("bench_logging", "INFO", use_queue=use_queue, stream=stream, log_dir=log_dir)
+    stop = asyncio.Event()
+    lags: list[float] = []
+    counter = [0]
+    tasks = [asyncio.create_task(probe(lags, stop))]
+    tasks += [asyncio.create_task(writer(logger, stop, counter)) for _ in range(writers)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    setup_logger("bench_logging", "INFO", use_queue=False, stream=SlowStream(0), log_dir=log_dir)
+
+    lags.sort()
+    return {
+        "records": counter[0],
+        "probe_p50_ms": statistics.median(lags) * 1000,
+        "probe_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "probe_max_ms": lags[-1] * 1000,
+        "stall_total_ms": sum(lag for lag in lags if lag > 0.001) * 1000,
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--write-latency-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        for use_queue in (False, True):
+            result = await run(use_queue, args.seconds, args.writers, args.write_latency_ms / 1000,
+                               Path(log_dir))
+            mode = "file d'attente" if use_queue else "synchrone"
+            print(f"{mode:>15} : {result['records']} logs, sonde p50={result['probe_p50_ms']:.2f}ms "
+                  f"p99={result['probe_p99_ms']:.2f}ms max={result['probe_max_ms']:.2f}ms, "
+                  f"blocage cumulé={result['stall_total_ms']:.0f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
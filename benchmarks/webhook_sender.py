@@ -0,0 +1,100 @@
+"""
+Mesure du débit du mode webhook avec un faux Telegram local
+
+Démarre un faux Bot API, attend que le bot (lancé avec TELEGRAM_MODE=webhook,
+WEBHOOK_URL égale à --webhook et TELEGRAM_API_BASE_URL pointant vers ce faux
+serveur) enregistre son webhook, puis envoie des updates synthétiques `/start`
+et mesure le débit.
+
+Usage:
+    python -m benchmarks.webhook_sender --webhook http://127.0.0.1:8443/telegram \\
+        --secret change-me --updates 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from benchmarks.fake_telegram import FakeTelegramAPI
+
+def make_update(update_id: int, chat_id: int) -> dict:
+    """Update Telegram synthétique contenant la commande /start"""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    }
+
+async def send_updates(webhook: str, secret: str, count: int, concurrency: int,
+                       chats: int) -> list[float]:
+    """Envoie `count` updates au webhook et retourne les latences HTTP"""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(1, count + 1):
+        queue.put_nowait(i)
+    latencies = []
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                started = time.perf_counter()
+                r = await client.post(webhook, json=make_update(i, 1000 + i % chats), headers=headers)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--webhook", default="http://127.0.0.1:8443/telegram")
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--chats", type=int, default=100)
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(port=args.api_port)
+    await api.start()
+    webhook = urlsplit(args.webhook)
+    print(f"Faux Telegram prêt. Lancez le bot avec :\n"
+          f"  TELEGRAM_MODE=webhook TELEGRAM_API_BASE_URL={api.base_url} "
+          f"TELEGRAM_FILE_BASE_URL={api.base_file_url} WEBHOOK_URL={args.webhook} "
+          f"WEBHOOK_PORT={webhook.port or 80} WEBHOOK_PATH={webhook.path.lstrip('/')} "
+          + (f"WEBHOOK_SECRET_TOKEN={args.secret} " if args.secret else "") + "python main.py")
+    await api.webhook_set.wait()
+    print("Webhook enregistré, envoi des updates...")
+
+    started = time.perf_counter()
+    started_mono = time.monotonic()
+    latencies = await send_updates(args.webhook, args.secret, args.updates, args.concurrency, args.chats)
+    ingest_time = time.perf_counter() - started
+
+    # Attendre les réponses du bot (une par /start)
+    deadline = time.monotonic() + 60
+    while api.replies < args.updates and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    total_time = (api.last_reply_at or time.monotonic()) - started_mono
+
+    latencies.sort()
+    print(f"Updates envoyées : {len(latencies)} en {ingest_time:.2f}s "
+          f"({len(latencies) / ingest_time:.0f} updates/s)")
+    print(f"Latence webhook : p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+    print(f"Réponses du bot : {api.replies}/{args.updates} en {total_time:.2f}s "
+          f"({api.replies / total_time:.0f} réponses/s)")
+    await api.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -15,15 +16,134 @@ class Settings(BaseSettings):
     vera_api_key: str = Field(..., validation_alias="VERA_API_KEY")
     
     log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
+    # Écriture des logs dans un thread dédié (pas d'I/O sur la boucle d'événements)
+    log_queue: bool = Field(default=True, validation_alias="LOG_QUEUE")
+    log_json: bool = Field(default=False, validation_alias="LOG_JSON")
+    log_max_bytes: int = 10 * 1024 * 1024  # Rotation des fichiers de logs/ (0 = désactivée)
+    log_backup_count: int = 5
     max_file_size_mb: int = Field(default=20, validation_alias="MAX_FILE_SIZE_MB")
     temp_download_path: Path = Field(default=Path("./temp_downloads"), validation_alias="TEMP_DOWNLOAD_PATH")
     
+    # Réception des updates : "polling" ou "webhook"
+    telegram_mode: str = Field(default="polling", validation_alias="TELEGRAM_MODE")
+    telegram_api_base_url: str = Field(default="https://api.telegram.org/bot", validation_alias="TELEGRAM_API_BASE_URL")
+    telegram_file_base_url: str = Field(default="https://api.telegram.org/file/bot", validation_alias="TELEGRAM_FILE_BASE_URL")
+    webhook_listen: str = Field(default="127.0.0.1", validation_alias="WEBHOOK_LISTEN")
+    webhook_port: int = Field(default=8443, validation_alias="WEBHOOK_PORT")
+    webhook_path: str = Field(default="telegram", validation_alias="WEBHOOK_PATH")
+    webhook_url: Optional[str] = Field(default=None, validation_alias="WEBHOOK_URL")
+    webhook_secret_token: Optional[str] = Field(default=None, validation_alias="WEBHOOK_SECRET_TOKEN")
+    webhook_unix_socket: Optional[Path] = Field(default=None, validation_alias="WEBHOOK_UNIX_SOCKET")
+    webhook_max_connections: int = 100
+    
     gemini_timeout: int = 120
+    gemini_max_concurrency: int = 8
+    gemini_upload_threshold_mb: int = 10
+    gemini_upload_ttl_seconds: int = 3600
+    gemini_upload_processing_timeout: int = 120  # Au-delà : envoi inline du fichier
+    # Regroupement des analyses de texte en un seul prompt (0 = désactivé)
+    gemini_batch_window_ms: int = 0
+    gemini_batch_max_items: int = 8
+    # Textes longs : découpage en morceaux (caractères) analysés en parallèle
+    gemini_chunk_chars: int = 6000
+    gemini_chunk_overlap: int = 300
+    gemini_max_chunks: int = 8  # Appels Gemini max par texte long (0 = illimité)
     vera_timeout: int = 60
     max_image_size_mb: int = 10
     max_video_size_mb: int = 50
     max_audio_size_mb: int = 20
     
+    # Mode multi-process (0 = un seul process)
+    worker_processes: int = Field(default=0, validation_alias="WORKER_PROCESSES")
+    worker_queue_size: int = 1000
+    
+    # Pools de travail par classe de coût (concurrence / file d'attente max)
+    concurrent_updates: int = 256
+    pool_text_concurrency: int = 16
+    pool_text_queue: int = 200
+    pool_image_concurrency: int = 6
+    pool_image_queue: int = 50
+    pool_audio_concurrency: int = 4
+    pool_audio_queue: int = 30
+    pool_video_concurrency: int = 2
+    pool_video_queue: int = 10
+    
+    # Préparation locale des vidéos avec ffmpeg (repli sur le fichier original)
+    video_preprocess_enabled: bool = True
+    ffmpeg_path: str = Field(default="ffmpeg", validation_alias="FFMPEG_PATH")
+    ffprobe_path: str = Field(default="ffprobe", validation_alias="FFPROBE_PATH")
+    ffmpeg_timeout: int = 120
+    video_keyframes: int = 6
+    video_keyframe_width: int = 512
+    video_audio_bitrate: str = "24k"
+    
+    # Préparation des images avec Pillow (réduction + réencodage)
+    image_preprocess_enabled: bool = True
+    image_max_dimension: int = 1600
+    image_jpeg_quality: int = 82
+    
+    # Préparation des audios (mono 16 kHz, silences supprimés, nécessite ffmpeg)
+    audio_preprocess_enabled: bool = True
+    audio_sample_rate: int = 16000
+    audio_bitrate: str = "16k"
+    audio_silence_threshold: int = 300  # RMS en PCM 16 bits (~ -40 dBFS)
+    audio_max_silence_ms: int = 600
+    audio_vad_padding_ms: int = 150
+    
+    # Pré-filtre local des textes (salutations, messages courts, opinions)
+    text_prefilter_enabled: bool = True
+    text_prefilter_min_chars: int = 12
+    text_prefilter_min_words: int = 3
+    text_prefilter_opinion_max_words: int = 12
+    
+    # Extraction locale des documents (PDF, DOCX, TXT)
+    document_max_chars: int = 50000
+    document_min_page_chars: int = 20  # En dessous : page considérée comme scannée
+    document_max_ocr_pages: int = 10
+    
+    # Récupération des pages web liées
+    link_max_urls: int = 5  # URLs traitées par message
+    link_url_timeout: float = 45.0  # Extraction + analyse d'une URL
+    url_fetch_timeout: float = 10.0
+    url_fetch_max_bytes: int = 2 * 1024 * 1024
+    url_fetch_max_connections: int = 20
+    url_fetch_max_redirects: int = 5
+    url_max_chars: int = 50000  # Texte extrait conservé par page
+    url_cache_max_entries: int = 500
+    
+    # Endpoint Prometheus local (0 = désactivé ; les workers utilisent port+1, port+2...)
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = Field(default=0, validation_alias="METRICS_PORT")
+    
+    # Export des traces (un span par étape) en JSONL ; None = trace ID dans les logs seulement
+    trace_export_path: Optional[Path] = Field(default=None, validation_alias="TRACE_EXPORT_PATH")
+    
+    # Sous ce seuil, images et audios sont téléchargés en mémoire (pas de disque)
+    memory_download_threshold_mb: int = 5
+    
+    # Pool HTTP Vera (connexion persistante, keep-alive, HTTP/2)
+    vera_http2: bool = True
+    vera_max_connections: int = 20
+    vera_max_keepalive_connections: int = 10
+    vera_keepalive_expiry: float = 60.0
+    
+    # Vérification de plusieurs affirmations en parallèle
+    vera_max_claims: int = 2
+    vera_claims_concurrency: int = 2
+    
+    # Affichage progressif du verdict Vera (éditions limitées par Telegram)
+    vera_stream_edits: bool = True
+    vera_stream_edit_interval: float = 1.5
+    
+    # Cache des verdicts (LRU mémoire + SQLite optionnel)
+    verdict_cache_enabled: bool = True
+    verdict_cache_max_entries: int = 2000
+    verdict_cache_ttl_seconds: int = 6 * 3600
+    verdict_cache_db_path: Optional[Path] = Field(default=None, validation_alias="VERDICT_CACHE_DB_PATH")
+    
+    # Cache des analyses de médias (file_unique_id / hash du contenu)
+    media_cache_max_entries: int = 500
+    
     accepted_image_formats: list = ["image/jpeg", "image/png", "image/webp"]
     accepted_video_formats: list = ["video/mpeg", "video/mp4"]
     accepted_audio_formats: list = ["audio/mpeg", "audio/ogg", "audio/wav"]
@@ -37,9 +157,15 @@ class Settings(BaseSettings):
     @property
     def max_file_size_bytes(self) -> int:
         return self.max_file_size_mb * 1024 * 1024
+    
+    @property
+    def memory_download_threshold_bytes(self) -> int:
+        return self.memory_download_threshold_mb * 1024 * 1024
 
 settings = Settings()
 
 # Configurer le logger APRÈS settings
 from utils.logger import setup_logger
-logger = setup_logger(log_level=settings.log_level)
\ No newline at end of file
+logger = setup_logger(log_level=settings.log_level, use_queue=settings.log_queue,
+                      json_format=settings.log_json, max_bytes=settings.log_max_bytes,
+                      backup_count=settings.log_backup_count)
\ No newline at end of file
@@ -8,10 +8,14 @@ import uuid
 
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from services.media_cache import media_cache, file_digest, data_digest
+from services.media_preprocessor import prepare_audio
 from config.settings import settings
 from utils.logger import logger
-from utils.formatters import format_fact_check_response, format_error_message, format_processing_message
-from utils.validators import validate_file_size, ValidationError
+from utils.formatters import format_fact_check_response, format_error_message, format_processing_message, format_verdicts
+from utils.validators import validate_file_size, validate_data_size, ValidationError
 
 async def handle_audio(update: Update, context: ContextTypes.DEFAULT_TYPE,
                       gemini_client: GeminiClient, vera_client: VeraClient) -> None:
@@ -33,32 +37,56 @@ async def handle_audio(update: Update, context: ContextTypes.DEFAULT_TYPE,
     file_path = None
     
     try:
-        file = await context.bot.get_file(audio.file_id)
-        ext = "ogg" if message.voice else "mp3"
-        file_path = settings.temp_download_path / f"{uuid.uuid4()}.{ext}"
-        await file.download_to_drive(str(file_path))
+        analyzed = media_cache.lookup(audio.file_unique_id, user_id)
         
-        validate_file_size(file_path, settings.max_audio_size_mb)
-        analyzed = await gemini_client.analyze_audio(file_path, user_id)
+        if analyzed is None:
+            file = await context.bot.get_file(audio.file_id)
+            ext = "ogg" if message.voice else "mp3"
+            
+            if file.file_size and file.file_size <= settings.memory_download_threshold_bytes:
+                # Petit fichier : téléchargé en mémoire, sans passer par le disque
+                with metrics.stage("download", "audio"):
+                    media = bytes(await file.download_as_bytearray())
+                validate_data_size(media, settings.max_audio_size_mb)
+                digest = data_digest(media)
+            else:
+                file_path = settings.temp_download_path / f"{uuid.uuid4()}.{ext}"
+                with metrics.stage("download", "audio"):
+                    await file.download_to_drive(str(file_path))
+                validate_file_size(file_path, settings.max_audio_size_mb)
+                media = file_path
+                digest = await file_digest(file_path)
+            
+            analyzed = media_cache.lookup(digest, user_id)
+            if analyzed is None:
+                prepared = await prepare_audio(media)
+                with metrics.stage("gemini", "audio"):
+                    if prepared:
+                        analyzed = await gemini_client.analyze_audio(prepared.data, user_id, prepared.mime_type)
+                    else:
+                        mime_type = "audio/ogg" if ext == "ogg" else "audio/mpeg"
+                        analyzed = await gemini_client.analyze_audio(media, user_id, mime_type)
+            media_cache.store(analyzed, audio.file_unique_id, digest)
         
         if not analyzed.has_claims():
             text_preview = analyzed.extracted_text[:200] + "..." if analyzed.extracted_text else "Pas de transcription"
             await processing_msg.edit_text(f"ℹ️ Audio analysé\n\n💬 {text_preview}\n\nAucune affirmation détectée")
             return
         
-        query = analyzed.get_primary_claim()
-        if not query:
+        claims = analyzed.get_claims(settings.vera_max_claims)
+        if not claims:
             await processing_msg.edit_text(format_error_message("processing_error"))
             return
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    analyzed.summary or "Audio", "audio")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
-        response = format_fact_check_response(analyzed.summary or "Audio", vera_response.raw_response, 
-                                             "audio", analyzed.claims)
-        await processing_msg.edit_text(response)
+        response = format_fact_check_response(analyzed.summary or "Audio", format_verdicts(vera_responses), 
+                                             "audio", claims)
+        await edit_final_response(processing_msg, response, "audio")
         
     except ValidationError as e:
         await processing_msg.edit_text(format_error_message("file_too_large", str(e)))
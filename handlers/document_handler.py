@@ -1,13 +1,18 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from pathlib import Path
+import asyncio
 import uuid
 
+from models.content import AnalyzedContent
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from services.document_extractor import can_extract, extract_document
 from config.settings import settings
 from utils.logger import logger
-from utils.formatters import format_fact_check_response, format_error_message, format_processing_message
+from utils.formatters import format_fact_check_response, format_error_message, format_processing_message, format_verdicts
 from utils.validators import validate_file_size, ValidationError
 
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE,
@@ -23,10 +28,9 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE,
         await message.reply_text(format_error_message("processing_error"))
         return
     
-    allowed_types = ['application/pdf', 'text/plain', 'application/msword', 
-                     'application/vnd.openxmlformats-officedocument.wordprocessingml.document']
-    if doc.mime_type not in allowed_types:
-        await message.reply_text(format_error_message("unsupported_format", "Formats: PDF, TXT, DOC, DOCX"))
+    # .doc (application/msword) : ni lisible localement ni accepté par Gemini
+    if not can_extract(doc.mime_type):
+        await message.reply_text(format_error_message("unsupported_format", "Formats: PDF, TXT, DOCX"))
         return
     if doc.file_size and doc.file_size > settings.max_file_size_mb * 1024 * 1024:
         await message.reply_text(format_error_message("file_too_large", f"Max: {settings.max_file_size_mb}MB"))
@@ -39,34 +43,45 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE,
         file = await context.bot.get_file(doc.file_id)
         ext = Path(doc.file_name).suffix if doc.file_name else '.pdf'
         file_path = settings.temp_download_path / f"{uuid.uuid4()}{ext}"
-        await file.download_to_drive(str(file_path))
+        with metrics.stage("download", "document"):
+            await file.download_to_drive(str(file_path))
         
         validate_file_size(file_path, settings.max_file_size_mb)
         
-        if doc.mime_type == 'text/plain':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+        # Texte extrait localement ; Gemini seulement pour l'OCR des pages scannées
+        document = await extract_document(file_path, doc.mime_type)
+        ocr_pages = await asyncio.gather(
+            *(gemini_client.analyze_image(page, user_id, 'application/pdf')
+              for page in document.scanned_pages),
+            return_exceptions=True
+        )
+        text = document.with_ocr([page.extracted_text if isinstance(page, AnalyzedContent) else None
+                                  for page in ocr_pages])
+        
+        if not text:
+            await processing_msg.edit_text("ℹ️ Aucun texte lisible dans le document")
+            return
+        with metrics.stage("gemini", "document"):
             analyzed = await gemini_client.analyze_text(text, user_id)
-        else:
-            analyzed = await gemini_client.analyze_image(file_path, user_id)
         
         if not analyzed.has_claims():
             await processing_msg.edit_text("ℹ️ Aucune affirmation détectée dans le document")
             return
         
-        query = analyzed.get_primary_claim()
-        if not query:
+        claims = analyzed.get_claims(settings.vera_max_claims)
+        if not claims:
             await processing_msg.edit_text("ℹ️ Aucune affirmation principale détectée dans le document")
             return
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    analyzed.summary or "Document", "document")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
-        response = format_fact_check_response(analyzed.summary or "Document", vera_response.raw_response,
-                                             "document", analyzed.claims)
-        await processing_msg.edit_text(response)
+        response = format_fact_check_response(analyzed.summary or "Document", format_verdicts(vera_responses),
+                                             "document", claims)
+        await edit_final_response(processing_msg, response, "document")
         
     except ValidationError as e:
         await processing_msg.edit_text(format_error_message("file_too_large", str(e)))
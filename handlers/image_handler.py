@@ -8,10 +8,14 @@ import uuid
 
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from services.media_cache import media_cache, file_digest, data_digest
+from services.media_preprocessor import prepare_image
 from config.settings import settings
 from utils.logger import logger
-from utils.formatters import format_fact_check_response, format_error_message, format_processing_message
-from utils.validators import validate_file_size, ValidationError
+from utils.formatters import format_fact_check_response, format_error_message, format_processing_message, format_verdicts
+from utils.validators import validate_file_size, validate_data_size, ValidationError
 
 async def handle_image(
     update: Update,
@@ -44,37 +48,59 @@ async def handle_image(
     file_path = None
     
     try:
-        file = await context.bot.get_file(photo.file_id)
-        file_path = settings.temp_download_path / f"{uuid.uuid4()}.jpg"
-        await file.download_to_drive(str(file_path))
+        analyzed = media_cache.lookup(photo.file_unique_id, user_id)
         
-        validate_file_size(file_path, settings.max_image_size_mb)
-        analyzed = await gemini_client.analyze_image(file_path, user_id)
+        if analyzed is None:
+            file = await context.bot.get_file(photo.file_id)
+            
+            if file.file_size and file.file_size <= settings.memory_download_threshold_bytes:
+                # Petit fichier : téléchargé en mémoire, sans passer par le disque
+                with metrics.stage("download", "image"):
+                    media = bytes(await file.download_as_bytearray())
+                validate_data_size(media, settings.max_image_size_mb)
+                digest = data_digest(media)
+            else:
+                file_path = settings.temp_download_path / f"{uuid.uuid4()}.jpg"
+                with metrics.stage("download", "image"):
+                    await file.download_to_drive(str(file_path))
+                validate_file_size(file_path, settings.max_image_size_mb)
+                media = file_path
+                digest = await file_digest(file_path)
+            
+            analyzed = media_cache.lookup(digest, user_id)
+            if analyzed is None:
+                prepared = await prepare_image(media)
+                with metrics.stage("gemini", "image"):
+                    if prepared:
+                        analyzed = await gemini_client.analyze_image(prepared.data, user_id, prepared.mime_type)
+                    else:
+                        analyzed = await gemini_client.analyze_image(media, user_id)
+            media_cache.store(analyzed, photo.file_unique_id, digest)
         
         if not analyzed.has_claims():
             await processing_msg.edit_text("ℹ️ Aucune affirmation détectée")
             return
         
-        query = analyzed.get_primary_claim()
-        
-        if not query:
+        claims = analyzed.get_claims(settings.vera_max_claims)
+        if not claims:
             await processing_msg.edit_text("ℹ️ Aucune affirmation détectée")
             return
         
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    analyzed.summary or "Image", "image")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
         response = format_fact_check_response(
             analyzed.summary or "Image",
-            vera_response.raw_response,
+            format_verdicts(vera_responses),
             "image",
-            analyzed.claims
+            claims
         )
         
-        await processing_msg.edit_text(response)
+        await edit_final_response(processing_msg, response, "image")
         logger.info(f"Analyse image terminée pour {user_id}")
         
     except ValidationError as e:
@@ -3,12 +3,24 @@ Handler pour les liens/URLs
 """
 from telegram import Update
 from telegram.ext import ContextTypes
+import asyncio
+from itertools import zip_longest
 
+from models.content import AnalyzedContent
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from config.settings import settings
 from utils.logger import logger
-from utils.formatters import format_fact_check_response, format_error_message, format_processing_message
+from utils.formatters import format_fact_check_response, format_error_message, format_processing_message, format_verdicts
 from utils.validators import extract_urls
+from utils.normalizers import canonicalize_url, normalize_claim
+
+async def _extract(gemini_client: GeminiClient, url: str, user_id: str) -> AnalyzedContent:
+    """Extraction d'une URL bornée dans le temps (une URL lente ne bloque pas les autres)"""
+    return await asyncio.wait_for(gemini_client.extract_from_url(url, user_id),
+                                  settings.link_url_timeout)
 
 async def handle_link(
     update: Update,
@@ -37,39 +49,74 @@ async def handle_link(
         await message.reply_text(format_error_message("invalid_url"))
         return
     
-    url = urls[0]
+    # Toutes les URLs distinctes du message, dans la limite configurée
+    unique = {}
+    for url in urls:
+        unique.setdefault(canonicalize_url(url), url)
+    urls = list(unique.values())[:settings.link_max_urls]
     processing_msg = await message.reply_text(format_processing_message("lien"))
     
     try:
-        analyzed = await gemini_client.extract_from_url(url, user_id)
+        with metrics.stage("extract", "lien"):
+            results = await asyncio.gather(*(_extract(gemini_client, url, user_id) for url in urls),
+                                           return_exceptions=True)
+        
+        sources, failed, claims, seen = [], [], [], set()
+        for url, analyzed in zip(urls, results):
+            if isinstance(analyzed, BaseException) or not analyzed.extracted_text:
+                if isinstance(analyzed, BaseException):
+                    logger.warning(f"Lien ignoré ({url}): {type(analyzed).__name__} {analyzed}")
+                failed.append(url)
+                continue
+            sources.append((url, analyzed))
         
-        if not analyzed.extracted_text:
+        # vera_max_claims pour tout le message : une affirmation par lien à tour de rôle
+        max_claims = max(settings.vera_max_claims, 1)
+        for ranked in zip_longest(*(source.get_claims(max_claims) for _, source in sources)):
+            for claim in ranked:
+                key = normalize_claim(claim) if isinstance(claim, str) else ""
+                if key and key not in seen and len(claims) < max_claims:
+                    seen.add(key)
+                    claims.append(claim)
+        
+        if not sources:
             await processing_msg.edit_text("⚠️ Contenu inaccessible\n\nEssayez de copier le texte directement")
             return
         
-        if not analyzed.has_claims():
-            await processing_msg.edit_text(f"ℹ️ Contenu analysé\n\n{analyzed.summary or 'Contenu web'}\n\nAucune affirmation détectée")
+        if len(sources) == 1:
+            summary = sources[0][1].summary
+        else:
+            summary = f"{len(sources)} liens analysés"
+        
+        if not any(source.has_claims() for _, source in sources):
+            await processing_msg.edit_text(f"ℹ️ Contenu analysé\n\n{summary or 'Contenu web'}\n\nAucune affirmation détectée")
             return
         
-        query = analyzed.get_primary_claim()
-        if not query:
+        if not claims:
             await processing_msg.edit_text("ℹ️ Contenu analysé\n\nAucune affirmation vérifiable détectée")
             return
         
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    summary or "Web", "lien")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
+        if len(urls) == 1:
+            footer = f"\n\n🔗 Source: {urls[0]}"
+        else:
+            footer = "\n\n🔗 Sources:\n" + "\n".join(f"• {url}" for url, _ in sources)
+            if failed:
+                footer += "\n\n⚠️ Inaccessibles:\n" + "\n".join(f"• {url}" for url in failed)
         response = format_fact_check_response(
-            analyzed.summary or "Web",
-            vera_response.raw_response,
+            summary or "Web",
+            format_verdicts(vera_responses),
             "lien",
-            analyzed.claims
+            claims
         )
-        response += f"\n\n🔗 Source: {url}"
-        await processing_msg.edit_text(response)
+        # Les verdicts sont coupés en premier pour garder la liste des sources
+        await edit_final_response(processing_msg, response, "lien", footer)
         
     except Exception as e:
         logger.error(f"Erreur: {e}")
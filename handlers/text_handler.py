@@ -6,11 +6,15 @@ from telegram.ext import ContextTypes
 
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from config.settings import settings
 from utils.logger import logger
 from utils.formatters import (
     format_fact_check_response,
     format_error_message,
-    format_processing_message
+    format_processing_message,
+    format_verdicts
 )
 from utils.validators import extract_urls
 
@@ -46,30 +50,32 @@ async def handle_text(
     processing_msg = await message.reply_text(format_processing_message("texte"))
     
     try:
-        analyzed = await gemini_client.analyze_text(text, user_id)
+        with metrics.stage("gemini", "texte"):
+            analyzed = await gemini_client.analyze_text(text, user_id)
         
         if not analyzed.has_claims():
             await processing_msg.edit_text("ℹ️ Aucune affirmation factuelle détectée")
             return
         
-        query = analyzed.get_primary_claim()
-        if not query:
+        claims = analyzed.get_claims(settings.vera_max_claims)
+        if not claims:
             await processing_msg.edit_text("ℹ️ Impossible d'extraire une affirmation vérifiable")
             return
         
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    analyzed.summary or text[:200], "texte")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
         response = format_fact_check_response(
             analyzed.summary or text[:200],
-            vera_response.raw_response,
+            format_verdicts(vera_responses),
             "texte",
-            analyzed.claims
+            claims
         )
-        await processing_msg.edit_text(response)
+        await edit_final_response(processing_msg, response, "texte")
         
     except Exception as e:
         logger.error(f"Erreur: {e}")
@@ -8,9 +8,13 @@ import uuid
 
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.telegram_service import verify_with_progress, edit_final_response
+from services.metrics import metrics
+from services.media_cache import media_cache, file_digest
+from services.media_preprocessor import prepare_video
 from config.settings import settings
 from utils.logger import logger
-from utils.formatters import format_fact_check_response, format_error_message, format_processing_message
+from utils.formatters import format_fact_check_response, format_error_message, format_processing_message, format_verdicts
 from utils.validators import validate_file_size, ValidationError
 
 async def handle_video(update: Update, context: ContextTypes.DEFAULT_TYPE,
@@ -43,33 +47,44 @@ async def handle_video(update: Update, context: ContextTypes.DEFAULT_TYPE,
     file_path = None
     
     try:
-        file = await context.bot.get_file(video.file_id)
-        ext = video.mime_type.split('/')[-1] if video.mime_type else 'mp4'
-        file_path = settings.temp_download_path / f"{uuid.uuid4()}.{ext}"
-        await file.download_to_drive(str(file_path))
+        analyzed = media_cache.lookup(video.file_unique_id, user_id)
         
-        validate_file_size(file_path, settings.max_video_size_mb)
-        analyzed = await gemini_client.analyze_video(file_path, user_id)
+        if analyzed is None:
+            file = await context.bot.get_file(video.file_id)
+            ext = video.mime_type.split('/')[-1] if video.mime_type else 'mp4'
+            file_path = settings.temp_download_path / f"{uuid.uuid4()}.{ext}"
+            with metrics.stage("download", "video"):
+                await file.download_to_drive(str(file_path))
+            
+            validate_file_size(file_path, settings.max_video_size_mb)
+            digest = await file_digest(file_path)
+            analyzed = media_cache.lookup(digest, user_id)
+            if analyzed is None:
+                prepared = await prepare_video(file_path)
+                with metrics.stage("gemini", "video"):
+                    analyzed = await gemini_client.analyze_video(file_path, user_id, prepared)
+            media_cache.store(analyzed, video.file_unique_id, digest)
         
         if not analyzed.has_claims():
             text_preview = analyzed.extracted_text[:200] + "..." if analyzed.extracted_text else "Pas de transcription"
             await processing_msg.edit_text(f"ℹ️ Vidéo analysée\n\n💬 {text_preview}\n\nAucune affirmation détectée")
             return
         
-        query = analyzed.get_primary_claim()
-        if not query:
+        claims = analyzed.get_claims(settings.vera_max_claims)
+        if not claims:
             await processing_msg.edit_text("ℹ️ Vidéo analysée\n\nAucune affirmation vérifiable trouvée")
             return
         
-        vera_response = await vera_client.verify_claim(user_id, query)
+        vera_responses = await verify_with_progress(processing_msg, vera_client, user_id, claims,
+                                                    analyzed.summary or "Vidéo", "video")
         
-        if not vera_response.is_valid():
+        if not any(r.is_valid() for r in vera_responses):
             await processing_msg.edit_text(format_error_message("vera_error"))
             return
         
-        response = format_fact_check_response(analyzed.summary or "Vidéo", vera_response.raw_response,
-                                             "video", analyzed.claims)
-        await processing_msg.edit_text(response)
+        response = format_fact_check_response(analyzed.summary or "Vidéo", format_verdicts(vera_responses),
+                                             "video", claims)
+        await edit_final_response(processing_msg, response, "video")
         
     except ValidationError as e:
         await processing_msg.edit_text(format_error_message("file_too_large", str(e)))
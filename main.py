@@ -4,11 +4,22 @@ Point d'entrée principal
 """
 import asyncio
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters, ContextTypes
 
 from config.settings import settings
 from services.gemini_client import GeminiClient
 from services.vera_client import VeraClient
+from services.verdict_cache import VerdictCache
+from services.media_cache import media_cache
+from services.url_fetcher import UrlFetcher
+from services import media_preprocessor, document_extractor
+from services.work_pools import work_pools, PoolFullError
+from services.metrics import metrics
+from services.worker_pool import WorkerPool
+from utils.formatters import format_error_message, format_prefilter_message
+from utils import text_filter
+from utils.text_filter import prefilter_text
+from utils.tracing import tracer
 import logging
 
 from handlers.text_handler import handle_text
@@ -61,19 +72,43 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
     
     if message.text and any(w.startswith(('http://', 'https://')) for w in message.text.split()):
-        await handle_link(update, context, gemini_client, vera_client)
+        handler, pool, content_type = handle_link, work_pools["text"], "lien"
     elif message.text:
-        await handle_text(update, context, gemini_client, vera_client)
+        reason = prefilter_text(message.text)
+        if reason:
+            metrics.rejections.inc(f"prefilter_{reason}")
+            # Réponse locale immédiate, sans appel Gemini ni place dans le pool
+            await message.reply_text(format_prefilter_message(reason))
+            return
+        handler, pool, content_type = handle_text, work_pools["text"], "texte"
     elif message.photo:
-        await handle_image(update, context, gemini_client, vera_client)
+        handler, pool, content_type = handle_image, work_pools["image"], "image"
     elif message.video:
-        await handle_video(update, context, gemini_client, vera_client)
+        handler, pool, content_type = handle_video, work_pools["video"], "video"
     elif message.audio or message.voice:
-        await handle_audio(update, context, gemini_client, vera_client)
+        handler, pool, content_type = handle_audio, work_pools["audio"], "audio"
     elif message.document:
-        await handle_document(update, context, gemini_client, vera_client)
+        handler, pool, content_type = handle_document, work_pools["image"], "document"
     else:
         await message.reply_text("❌ Type non supporté. /help pour plus d'infos")
+        return
+    
+    async def notify_queued(position: int) -> None:
+        await message.reply_text(f"⏳ En file d'attente (position {position})")
+    
+    metrics.inflight.inc(content_type)
+    try:
+        with tracer.span("update", new_trace=True, update_id=update.update_id,
+                         user_id=message.from_user.id if message.from_user else None), \
+                metrics.stage("total", content_type):
+            async with pool.slot(notify_queued):
+                await handler(update, context, gemini_client, vera_client)
+    except PoolFullError:
+        metrics.rejections.inc(f"pool_full_{pool.name}")
+        logger.warning(f"File {pool.name} pleine, message refusé")
+        await message.reply_text(format_error_message("overloaded"))
+    finally:
+        metrics.inflight.dec(content_type)
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.error(f"Erreur: {context.error}", exc_info=context.error)
@@ -83,9 +118,39 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
 async def post_init(application: Application) -> None:
     global gemini_client, vera_client
     logger.info("Init clients...")
+    await metrics.start_server(settings.metrics_host, settings.metrics_port)
+    tracer.configure(settings.trace_export_path)
     
-    gemini_client = GeminiClient(settings.gemini_api_key, settings.gemini_model)
-    vera_client = VeraClient(settings.vera_api_url, settings.vera_api_key, settings.vera_timeout)
+    gemini_client = GeminiClient(settings.gemini_api_key, settings.gemini_model,
+                                 settings.gemini_max_concurrency,
+                                 upload_threshold_mb=settings.gemini_upload_threshold_mb,
+                                 upload_ttl_seconds=settings.gemini_upload_ttl_seconds,
+                                 upload_processing_timeout=settings.gemini_upload_processing_timeout,
+                                 batch_window_ms=settings.gemini_batch_window_ms,
+                                 batch_max_items=settings.gemini_batch_max_items,
+                                 chunk_chars=settings.gemini_chunk_chars,
+                                 chunk_overlap=settings.gemini_chunk_overlap,
+                                 max_chunks=settings.gemini_max_chunks,
+                                 url_fetcher=UrlFetcher(settings.url_fetch_timeout,
+                                                        settings.url_fetch_max_bytes,
+                                                        settings.url_fetch_max_connections,
+                                                        settings.url_cache_max_entries,
+                                                        settings.url_fetch_max_redirects,
+                                                        settings.url_max_chars))
+    metrics.gauge("bot_gemini_waiting", "Appels Gemini en attente de la limite de concurrence", (),
+                  lambda: {(): gemini_client.stats["waiting"]})
+    vera_client = VeraClient(
+        settings.vera_api_url, settings.vera_api_key, settings.vera_timeout,
+        http2=settings.vera_http2,
+        max_connections=settings.vera_max_connections,
+        max_keepalive_connections=settings.vera_max_keepalive_connections,
+        keepalive_expiry=settings.vera_keepalive_expiry,
+        cache=VerdictCache(
+            settings.verdict_cache_max_entries,
+            settings.verdict_cache_ttl_seconds,
+            settings.verdict_cache_db_path
+        ) if settings.verdict_cache_enabled else None
+    )
     
     if await vera_client.health_check():
         logger.info("✅ Vera OK")
@@ -93,10 +158,51 @@ async def post_init(application: Application) -> None:
         logger.warning("⚠️ Vera failed")
     logger.info("✅ Bot ready")
 
-def main() -> None:
-    logger.info("🚀 Starting bot...")
+async def post_shutdown(application: Application) -> None:
+    if gemini_client is not None:
+        logger.info(f"Gemini stats: {gemini_client.get_stats()}")
+        await gemini_client.close()
+        if gemini_client.url_fetcher is not None:
+            logger.info(f"Pages web: {gemini_client.url_fetcher.get_stats()}")
+            await gemini_client.url_fetcher.close()
+    if vera_client is not None:
+        logger.info(f"Vera stats: {vera_client.get_stats()}")
+        if vera_client.cache is not None:
+            logger.info(f"Cache verdicts: {vera_client.cache.get_stats()}")
+            vera_client.cache.close()
+        await vera_client.close()
+    logger.info(f"Cache médias: {media_cache.get_stats()}")
+    logger.info(f"Préparation médias: {media_preprocessor.stats}")
+    logger.info(f"Pré-filtre texte: {text_filter.stats}")
+    logger.info(f"Extraction documents: {document_extractor.stats}")
+    for pool in work_pools.values():
+        logger.info(f"Pool {pool.name}: {pool.get_stats()}")
+    await metrics.stop_server()
+    tracer.close()
+    logger.info("✅ Clients fermés")
+
+def build_application(with_updater: bool = True) -> Application:
+    """
+    Construit l'application complète (handlers + clients)
     
-    app = Application.builder().token(settings.telegram_bot_token).post_init(post_init).build()
+    Args:
+        with_updater: False pour un worker qui reçoit ses updates du process d'ingestion
+        
+    Returns:
+        Application configurée
+    """
+    builder = (
+        Application.builder()
+        .token(settings.telegram_bot_token)
+        .base_url(settings.telegram_api_base_url)
+        .base_file_url(settings.telegram_file_base_url)
+        .concurrent_updates(settings.concurrent_updates)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if not with_updater:
+        builder = builder.updater(None)
+    app = builder.build()
     
     app.add_handler(CommandHandler("start", start_command))
     app.add_handler(CommandHandler("help", help_command))
@@ -106,9 +212,61 @@ def main() -> None:
         filters.VOICE | filters.Document.ALL, handle_message
     ))
     app.add_error_handler(error_handler)
+    return app
+
+def build_ingest_application(pool: WorkerPool) -> Application:
+    """Application du process d'ingestion : reçoit les updates et les confie aux workers"""
+    app = (
+        Application.builder()
+        .token(settings.telegram_bot_token)
+        .base_url(settings.telegram_api_base_url)
+        .base_file_url(settings.telegram_file_base_url)
+        .post_init(pool.start)
+        .post_shutdown(pool.stop)
+        .build()
+    )
+    app.add_handler(TypeHandler(Update, pool.dispatch))
+    return app
+
+def main() -> None:
+    logger.info("🚀 Starting bot...")
     
-    logger.info("✅ Polling...")
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    if settings.worker_processes > 0:
+        logger.info(f"Mode multi-process: {settings.worker_processes} workers")
+        app = build_ingest_application(WorkerPool(settings.worker_processes, settings.worker_queue_size))
+    else:
+        app = build_application()
+    
+    if settings.telegram_mode == "webhook":
+        run_webhook(app)
+    else:
+        logger.info("✅ Polling...")
+        app.run_polling(allowed_updates=Update.ALL_TYPES)
+
+def run_webhook(app: Application) -> None:
+    """Reçoit les updates via un serveur HTTP local (derrière un reverse proxy)"""
+    if not settings.webhook_url:
+        # Sinon PTB enregistre https://<listen>:<port>/<path>, injoignable derrière un proxy
+        raise RuntimeError("TELEGRAM_MODE=webhook nécessite WEBHOOK_URL (URL publique du reverse proxy)")
+    if not settings.webhook_secret_token:
+        logger.warning("⚠️ Webhook sans WEBHOOK_SECRET_TOKEN : les requêtes ne sont pas authentifiées")
+    
+    # PTB refuse unix + listen : l'adresse TCP n'est passée que sans socket unix
+    if settings.webhook_unix_socket:
+        logger.info(f"✅ Webhook sur unix:{settings.webhook_unix_socket}")
+        server = {"unix": settings.webhook_unix_socket}
+    else:
+        logger.info(f"✅ Webhook sur {settings.webhook_listen}:{settings.webhook_port}/{settings.webhook_path}")
+        server = {"listen": settings.webhook_listen, "port": settings.webhook_port}
+    
+    app.run_webhook(
+        **server,
+        url_path=settings.webhook_path,
+        webhook_url=settings.webhook_url,
+        secret_token=settings.webhook_secret_token,
+        max_connections=settings.webhook_max_connections,
+        allowed_updates=Update.ALL_TYPES
+    )
 
 if __name__ == "__main__":
     try:
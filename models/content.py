@@ -55,6 +55,10 @@ class AnalyzedContent:
         """Retourne l'affirmation principale"""
         return self.claims[0] if self.claims else None
     
+    def get_claims(self, limit: int) -> List[str]:
+        """Retourne les `limit` premières affirmations non vides"""
+        return [claim for claim in self.claims if claim][:max(limit, 1)]
+    
     def to_dict(self) -> dict:
         """Convertit en dictionnaire"""
         return {
@@ -90,6 +94,7 @@ class VeraResponse:
     raw_response: str
     success: bool
     error_message: Optional[str] = None
+    cached: bool = False  # Verdict servi depuis le cache
     
     def is_valid(self) -> bool:
         """Vérifie si la réponse est valide"""
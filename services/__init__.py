@@ -1,4 +1,5 @@
 from .gemini_client import GeminiClient
 from .vera_client import VeraClient
+from .verdict_cache import VerdictCache
 
-__all__ = ['GeminiClient', 'VeraClient']
+__all__ = ['GeminiClient', 'VeraClient', 'VerdictCache']
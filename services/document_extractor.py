@@ -0,0 +1,150 @@
+"""
+Extraction locale du texte des documents (PDF, DOCX, TXT)
+
+Le texte est extrait hors de la boucle d'événements, page par page ou
+paragraphe par paragraphe, jusqu'à `document_max_chars`. Seules les pages
+PDF sans texte mais contenant des images (scans) sont renvoyées pour OCR ;
+leur texte est ensuite réinséré à la place de la page. Les .doc (Word 97-2003)
+ne sont pas pris en charge.
+"""
+import asyncio
+import io
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config.settings import settings
+from services.metrics import metrics
+
+logger = logging.getLogger("telegram_bot")
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_MIME = "text/plain"
+
+stats = {"documents": 0, "pages": 0, "scanned_pages": 0, "chars": 0}
+
+@dataclass
+class ExtractedDocument:
+    """Texte extrait d'un document + pages scannées à passer en OCR"""
+    text: str = ""
+    pages: int = 0
+    parts: list[str] = field(default_factory=list)
+    scanned_pages: list[bytes] = field(default_factory=list)  # PDF d'une page chacun
+    scanned_at: list[int] = field(default_factory=list)  # Position de chaque page scannée dans parts
+    truncated: bool = False
+
+    def with_ocr(self, ocr_texts: list[Optional[str]]) -> str:
+        """
+        Texte complet dans l'ordre des pages
+
+        Args:
+            ocr_texts: Texte OCR de chaque page scannée (None si échec), dans l'ordre
+
+        Returns:
+            Texte extrait avec le texte OCR inséré à la place de chaque page scannée
+        """
+        parts = list(self.parts)
+        # Depuis la fin : les positions précédentes restent valables
+        for position, text in reversed(list(zip(self.scanned_at, ocr_texts))):
+            if text:
+                parts.insert(position, text)
+        return "\n".join(parts).strip()
+
+def _has_images(page) -> bool:
+    try:
+        resources = page.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources else None
+        return bool(xobjects and xobjects.get_object())
+    except Exception:
+        return False
+
+def _single_page_pdf(page) -> bytes:
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def _iter_pdf(path: Path, document: ExtractedDocument) -> Iterator[Optional[str]]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page in reader.pages:
+        document.pages += 1
+        text = (page.extract_text() or "").strip()
+        if len(text) >= settings.document_min_page_chars:
+            yield text
+        elif _has_images(page) and len(document.scanned_pages) < settings.document_max_ocr_pages:
+            document.scanned_pages.append(_single_page_pdf(page))
+            yield None  # Emplacement du texte OCR
+        elif text:
+            yield text
+
+def _iter_docx(path: Path, document: ExtractedDocument) -> Iterator[str]:
+    import docx
+
+    word = docx.Document(str(path))
+    document.pages = 1
+    for paragraph in word.paragraphs:
+        if paragraph.text.strip():
+            yield paragraph.text.strip()
+    for table in word.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                yield " | ".join(cells)
+
+def _iter_txt(path: Path, document: ExtractedDocument) -> Iterator[str]:
+    document.pages = 1
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+EXTRACTORS = {PDF_MIME: _iter_pdf, DOCX_MIME: _iter_docx, TEXT_MIME: _iter_txt}
+
+def _extract(path: Path, mime_type: str) -> ExtractedDocument:
+    """Extraction bloquante (exécutée dans un thread)"""
+    document = ExtractedDocument()
+    parts, size = document.parts, 0
+    for part in EXTRACTORS[mime_type](path, document):
+        if part is None:
+            document.scanned_at.append(len(parts))
+            continue
+        if size + len(part) > settings.document_max_chars:
+            parts.append(part[:settings.document_max_chars - size])
+            document.truncated = True
+            break
+        parts.append(part)
+        size += len(part) + 1
+    document.text = "\n".join(parts).strip()
+    return document
+
+def can_extract(mime_type: Optional[str]) -> bool:
+    """Indique si le type de document est extrait localement"""
+    return mime_type in EXTRACTORS
+
+async def extract_document(path: Path, mime_type: str) -> ExtractedDocument:
+    """
+    Extrait le texte d'un document hors de la boucle d'événements
+
+    Args:
+        path: Chemin du document téléchargé
+        mime_type: Type MIME (PDF, DOCX ou TXT)
+
+    Returns:
+        Document extrait (texte + pages scannées éventuelles)
+    """
+    with metrics.stage("extract", "document"):
+        document = await asyncio.to_thread(_extract, path, mime_type)
+    stats["documents"] += 1
+    stats["pages"] += document.pages
+    stats["scanned_pages"] += len(document.scanned_pages)
+    stats["chars"] += len(document.text)
+    logger.info(f"Document extrait: {document.pages} pages, {len(document.text)} caractères, "
+                f"{len(document.scanned_pages)} pages scannées"
+                + (" (tronqué)" if document.truncated else ""))
+    return document
@@ -3,25 +3,214 @@ Client pour l'API Google Gemini
 """
 import google.generativeai as genai
 from pathlib import Path
+from typing import Optional, Union
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import aiofiles
 import json
 import re
+import time
 import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
 
 from models.content import AnalyzedContent, ContentType, ClaimType
+from services.media_cache import file_digest
+from services.media_preprocessor import MediaPart
+from services.metrics import metrics
+from services.url_fetcher import FetchError, UrlFetcher
+from utils.batcher import MicroBatcher
+from utils.chunking import split_text
+from utils.normalizers import canonicalize_url, normalize_claim
+from utils.singleflight import SingleFlight
+from utils.tracing import tracer
 
 logger = logging.getLogger("telegram_bot")
 
+@dataclass
+class _Upload:
+    """Fichier uploadé chez Gemini et requêtes en cours qui l'utilisent"""
+    file: object
+    expires_at: float
+    users: int = 0
+    retired: bool = False  # Sorti du cache : supprimé dès qu'il n'est plus utilisé
+
 class GeminiClient:
     """Client pour interagir avec l'API Gemini"""
     
-    def __init__(self, api_key: str, model_name: str):
-        """Initialise le client Gemini"""
+    def __init__(self, api_key: str, model_name: str, max_concurrency: int = 8,
+                 upload_threshold_mb: int = 10, upload_ttl_seconds: int = 3600,
+                 max_uploads: int = 20, upload_processing_timeout: float = 120,
+                 batch_window_ms: int = 0, batch_max_items: int = 8,
+                 chunk_chars: int = 6000, chunk_overlap: int = 300, max_chunks: int = 8,
+                 url_fetcher: Optional[UrlFetcher] = None):
+        """Initialise le client Gemini (batch_window_ms > 0 active le regroupement des textes)"""
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model_name)
-        self.executor = ThreadPoolExecutor(max_workers=3)
-        logger.info(f"Gemini init: {model_name}")
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        # Fichiers au-delà du seuil : envoyés via l'API Files depuis le disque
+        self.upload_threshold_bytes = upload_threshold_mb * 1024 * 1024
+        self.upload_ttl_seconds = upload_ttl_seconds
+        self.max_uploads = max_uploads
+        # Au-delà, le fichier est envoyé inline plutôt que d'attendre la fin du traitement
+        self.upload_processing_timeout = upload_processing_timeout
+        self._uploads: OrderedDict[str, _Upload] = OrderedDict()
+        # Analyses identiques en cours (texte, URL) partagées entre utilisateurs
+        self.inflight = SingleFlight()
+        # Textes courts regroupés en un seul prompt (optionnel)
+        self.batcher = (MicroBatcher(self._text_results, batch_window_ms / 1000, batch_max_items)
+                        if batch_window_ms > 0 else None)
+        # Pages web téléchargées localement ; seul leur texte est analysé
+        self.url_fetcher = url_fetcher
+        # Textes longs découpés en morceaux analysés en parallèle (0 = jamais)
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        # Appels Gemini max par texte : au-delà, morceaux répartis sur tout le texte
+        self.max_chunks = max_chunks
+        # Attente derrière la limite de concurrence
+        self.stats = {"calls": 0, "waiting": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0,
+                      "uploads": 0, "uploads_reused": 0, "upload_timeouts": 0, "batch_retries": 0,
+                      "chunked_texts": 0, "chunks": 0, "chunks_skipped": 0}
+        logger.info(f"Gemini init: {model_name} (concurrence max: {max_concurrency})")
+    
+    async def _generate(self, contents):
+        """Appel asynchrone natif à Gemini, borné par la limite de concurrence"""
+        queued_at = time.monotonic()
+        self.stats["waiting"] += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+        
+        wait = time.monotonic() - queued_at
+        self.stats["calls"] += 1
+        self.stats["queue_wait_total"] += wait
+        self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], wait)
+        if wait > 1:
+            logger.info(f"Gemini: {wait:.1f}s d'attente dans la file")
+        
+        try:
+            with tracer.span("gemini.generate", queue_wait=round(wait, 3)):
+                return await self.model.generate_content_async(contents)
+        finally:
+            self.semaphore.release()
+    
+    @asynccontextmanager
+    async def _media_part(self, media: Union[Path, bytes], mime_type: str):
+        """
+        Prépare un média pour la requête Gemini
+        
+        Les octets déjà en mémoire et les fichiers sous le seuil sont envoyés
+        inline ; au-delà le fichier est uploadé en streaming depuis le disque
+        et seule la référence est envoyée. L'upload n'est pas supprimé avant
+        la sortie du bloc `async with`, même s'il sort du cache entre-temps.
+        
+        Args:
+            media: Chemin du fichier ou contenu en mémoire
+            mime_type: Type MIME
+            
+        Yields:
+            Partie de contenu (dict inline ou fichier Gemini)
+        """
+        if isinstance(media, (bytes, bytearray)):
+            yield {'mime_type': mime_type, 'data': bytes(media)}
+            return
+        upload = None
+        if media.stat().st_size >= self.upload_threshold_bytes:
+            upload = await self._upload(media, mime_type)
+        if upload is None:
+            async with aiofiles.open(media, 'rb') as f:
+                yield {'mime_type': mime_type, 'data': await f.read()}
+            return
+        try:
+            yield upload.file
+        finally:
+            upload.users -= 1
+            if upload.retired and not upload.users:
+                await self._delete_upload(upload.file)
+    
+    async def _upload(self, path: Path, mime_type: str) -> Optional[_Upload]:
+        """
+        Upload un fichier (ou réutilise un upload encore valide du même contenu)
+        
+        Returns:
+            Upload réservé (l'appelant décrémente `users` après usage), ou None
+            si Gemini n'a pas fini de traiter le fichier dans le délai imparti
+        """
+        await self._purge_uploads()
+        key = f"{await file_digest(path)}:{mime_type}"
+        
+        entry = self._uploads.get(key)
+        if entry:
+            self._uploads.move_to_end(key)
+            entry.users += 1
+            self.stats["uploads_reused"] += 1
+            metrics.cache_hits.inc("gemini_upload")
+            return entry
+        
+        uploaded = await asyncio.to_thread(genai.upload_file, path, mime_type=mime_type)
+        deadline = time.monotonic() + self.upload_processing_timeout
+        while uploaded.state.name == "PROCESSING":
+            if time.monotonic() >= deadline:
+                self.stats["upload_timeouts"] += 1
+                logger.warning(f"Upload Gemini toujours en traitement après "
+                               f"{self.upload_processing_timeout:.0f}s ({uploaded.name}), envoi inline")
+                await self._delete_upload(uploaded)
+                return None
+            await asyncio.sleep(2)
+            uploaded = await asyncio.to_thread(genai.get_file, uploaded.name)
+        if uploaded.state.name != "ACTIVE":
+            await self._delete_upload(uploaded)
+            raise RuntimeError(f"Upload Gemini échoué: {uploaded.state.name}")
+        
+        self.stats["uploads"] += 1
+        logger.info(f"Upload Gemini: {uploaded.name} ({path.stat().st_size / (1024*1024):.1f} MB)")
+        # Réservé avant tout await : l'éviction ci-dessous ne peut pas le supprimer
+        entry = _Upload(uploaded, time.monotonic() + self.upload_ttl_seconds, users=1)
+        previous = self._uploads.pop(key, None)
+        self._uploads[key] = entry
+        if previous:
+            # Même contenu uploadé en parallèle par une autre requête
+            await self._retire_upload(previous)
+        while len(self._uploads) > self.max_uploads:
+            _, evicted = self._uploads.popitem(last=False)
+            await self._retire_upload(evicted)
+        return entry
+    
+    async def _purge_uploads(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, entry in self._uploads.items() if entry.expires_at <= now]:
+            await self._retire_upload(self._uploads.pop(key))
+    
+    async def _retire_upload(self, entry: _Upload) -> None:
+        """Retire un upload du cache ; supprimé tout de suite s'il n'est plus utilisé"""
+        entry.retired = True
+        if not entry.users:
+            await self._delete_upload(entry.file)
+    
+    async def _delete_upload(self, uploaded) -> None:
+        try:
+            await asyncio.to_thread(genai.delete_file, uploaded.name)
+        except Exception as e:
+            logger.warning(f"Suppression upload Gemini impossible ({uploaded.name}): {e}")
+    
+    async def close(self) -> None:
+        """Supprime les fichiers encore uploadés chez Gemini (ceux en cours d'usage à leur libération)"""
+        while self._uploads:
+            _, entry = self._uploads.popitem()
+            await self._retire_upload(entry)
+    
+    def get_stats(self) -> dict:
+        """Retourne les statistiques d'appels et d'attente"""
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "queue_wait_avg": self.stats["queue_wait_total"] / calls if calls else 0.0,
+            "max_concurrency": self.max_concurrency,
+            "coalesced": self.inflight.stats["coalesced"],
+            "batching": self.batcher.get_stats() if self.batcher else None,
+        }
     
     async def analyze_text(self, text: str, user_id: str) -> AnalyzedContent:
         """
@@ -36,56 +225,146 @@ class GeminiClient:
         """
         logger.info(f"Analyse de texte pour user {user_id}")
         
+        analyzed = await self.inflight.do(f"text:{normalize_claim(text)}",
+                                          lambda: self._analyze_text(text, user_id))
+        return replace(analyzed, user_id=user_id, claims=list(analyzed.claims))
+    
+    async def _analyze_text(self, text: str, user_id: str) -> AnalyzedContent:
+        try:
+            return await self._text_analysis(text, user_id)
+        except Exception as e:
+            logger.error(f"Erreur Gemini: {e}")
+            return AnalyzedContent(content_type=ContentType.TEXT, user_id=user_id, 
+                                 extracted_text=text, claims=[text[:self.chunk_chars or None]])
+    
+    async def _text_analysis(self, text: str, user_id: str) -> AnalyzedContent:
+        """Analyse Gemini d'un texte (découpé si besoin), sans repli : lève les erreurs"""
+        chunks = split_text(text, self.chunk_chars, self.chunk_overlap) if self.chunk_chars else [text]
+        if len(chunks) > 1:
+            result = await self._merge_chunks(chunks)
+        else:
+            result = await (self.batcher.submit(text) if self.batcher else self._text_result(text))
+        
+        return AnalyzedContent(
+            content_type=ContentType.TEXT, user_id=user_id, extracted_text=text,
+            summary=result.get("summary"), claims=result.get("claims", []),
+            claim_type=ClaimType(result.get("claim_type", "unknown"))
+        )
+    
+    async def _merge_chunks(self, chunks: list[str]) -> dict:
+        """
+        Analyse les morceaux d'un texte long en parallèle et fusionne les résultats
+        
+        Au-delà de `max_chunks` morceaux, seul un échantillon régulier est analysé.
+        
+        Args:
+            chunks: Morceaux produits par `split_text`
+            
+        Returns:
+            Résultat JSON fusionné (affirmations dédupliquées, dans l'ordre du texte)
+        """
+        self.stats["chunked_texts"] += 1
+        if self.max_chunks and len(chunks) > self.max_chunks:
+            # Échantillon régulier (début et fin compris) : un texte très long ne monopolise
+            # pas la limite de concurrence Gemini partagée par tous les utilisateurs
+            step = (len(chunks) - 1) / max(self.max_chunks - 1, 1)
+            kept = sorted({round(i * step) for i in range(self.max_chunks)})
+            logger.info(f"Texte long: {len(kept)} morceaux analysés sur {len(chunks)}")
+            self.stats["chunks_skipped"] += len(chunks) - len(kept)
+            chunks = [chunks[i] for i in kept]
+        self.stats["chunks"] += len(chunks)
+        results = await asyncio.gather(*(self._text_result(chunk) for chunk in chunks),
+                                       return_exceptions=True)
+        results = [r for r in results if isinstance(r, dict)]
+        if not results:
+            raise RuntimeError(f"Aucun des {len(chunks)} morceaux n'a pu être analysé")
+        
+        claims, seen = [], set()
+        for result in results:
+            for claim in result.get("claims") or []:
+                key = normalize_claim(claim) if isinstance(claim, str) else ""
+                if key and key not in seen:
+                    seen.add(key)
+                    claims.append(claim)
+        
+        claim_types = [r.get("claim_type") for r in results]
+        summaries = [r["summary"] for r in results if r.get("summary")]
+        return {
+            "summary": summaries[0] if summaries else None,
+            "claims": claims,
+            "claim_type": "factual" if "factual" in claim_types else (claim_types[0] or "unknown"),
+        }
+    
+    async def _text_result(self, text: str) -> dict:
+        """Analyse d'un seul texte (résultat JSON brut)"""
         prompt = f"""Analyse et trouve affirmations factuelles.
 Texte: {text}
 JSON: {{"summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unknown"}}"""
         
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(self.executor, self.model.generate_content, prompt)
-            result = self._parse_json(response.text)
+        response = await self._generate(prompt)
+        return self._parse_json(response.text)
+    
+    async def _text_results(self, texts: list[str]) -> list:
+        """
+        Analyse un lot de textes en un seul prompt
+        
+        Si la réponse n'est pas un tableau JSON valide de la bonne taille, ou si
+        ses ids ne sont pas exactement 0..n-1, les textes sont réanalysés un par un.
+        
+        Args:
+            texts: Textes du lot
             
-            return AnalyzedContent(
-                content_type=ContentType.TEXT, user_id=user_id, extracted_text=text,
-                summary=result.get("summary"), claims=result.get("claims", []),
-                claim_type=ClaimType(result.get("claim_type", "unknown"))
-            )
+        Returns:
+            Un résultat JSON (ou une exception) par texte, dans l'ordre
+        """
+        if len(texts) == 1:
+            return [await self._text_result(texts[0])]
+        
+        items = "\n".join(f"[{i}] {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(texts))
+        prompt = f"""Analyse chaque texte et trouve ses affirmations factuelles.
+Textes:
+{items}
+JSON: tableau de {len(texts)} objets dans le même ordre, [{{"id": 0, "summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unknown"}}, ...]"""
+        
+        try:
+            response = await self._generate(prompt)
+            results = self._parse_json(response.text)
+            if (isinstance(results, list) and len(results) == len(texts)
+                    and all(isinstance(r, dict) for r in results)):
+                ids = [r.get("id") for r in results]
+                if all(i is None for i in ids):
+                    return results
+                # Remet dans l'ordre si le modèle a renvoyé les ids dans le désordre ; des ids
+                # incohérents (doublons, manquants) pourraient mélanger les résultats des utilisateurs
+                if all(isinstance(i, int) for i in ids) and sorted(ids) == list(range(len(texts))):
+                    by_id = {r["id"]: r for r in results}
+                    return [by_id[i] for i in range(len(texts))]
+            logger.warning(f"Réponse groupée invalide ({len(texts)} textes), analyse un par un")
         except Exception as e:
-            logger.error(f"Erreur Gemini: {e}")
-            return AnalyzedContent(content_type=ContentType.TEXT, user_id=user_id, 
-                                 extracted_text=text, claims=[text])
+            logger.warning(f"Erreur Gemini groupée ({len(texts)} textes), analyse un par un: {e}")
+        
+        self.stats["batch_retries"] += 1
+        return await asyncio.gather(*(self._text_result(text) for text in texts), return_exceptions=True)
     
-    async def analyze_image(self, image_path: Path, user_id: str) -> AnalyzedContent:
+    async def analyze_image(self, image_path: Union[Path, bytes], user_id: str,
+                            mime_type: str = 'image/jpeg') -> AnalyzedContent:
         """
         Analyse une image (OCR + détection d'affirmations)
         
         Args:
-            image_path: Chemin vers l'image
+            image_path: Chemin vers l'image (ou contenu en mémoire)
             user_id: ID de l'utilisateur
+            mime_type: Type MIME réel de l'image
             
         Returns:
             Contenu analysé
         """
-        logger.info(f"Analyse d'image pour user {user_id}: {image_path}")
+        logger.info(f"Analyse d'image pour user {user_id}: {self._describe(image_path)}")
         
         prompt = """Extrait texte et affirmations. JSON: {"extracted_text": "...", "claims": ["..."]}"""
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Lire l'image en bytes
-            def read_image():
-                with open(str(image_path), 'rb') as f:
-                    image_data = f.read()
-                return {
-                    'mime_type': 'image/jpeg',
-                    'data': image_data
-                }
-            
-            img_data = await loop.run_in_executor(self.executor, read_image)
-            response = await loop.run_in_executor(
-                self.executor, 
-                lambda: self.model.generate_content([prompt, img_data])
-            )
+            async with self._media_part(image_path, mime_type) as img_data:
+                response = await self._generate([prompt, img_data])
             result = self._parse_json(response.text)
             
             return AnalyzedContent(
@@ -98,37 +377,57 @@ JSON: {{"summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unkn
             logger.error(f"Erreur image: {e}")
             raise
     
-    async def analyze_video(self, video_path: Path, user_id: str) -> AnalyzedContent:
+    async def analyze_video(self, video_path: Path, user_id: str,
+                            prepared: Optional[list[MediaPart]] = None) -> AnalyzedContent:
         """
         Analyse une vidéo (transcription audio + analyse visuelle)
         
         Args:
             video_path: Chemin vers la vidéo
             user_id: ID de l'utilisateur
+            prepared: Piste audio + images clés extraites localement (remplace le fichier)
             
         Returns:
             Contenu analysé
         """
         logger.info(f"Analyse de vidéo pour user {user_id}: {video_path}")
         
+        if prepared:
+            prompt = """Piste audio et images clés d'une vidéo. Transcris et analyse. JSON: {"transcription": "...", "claims": ["..."]}"""
+            try:
+                parts = [{'mime_type': part.mime_type, 'data': part.data} for part in prepared]
+                response = await self._generate([prompt, *parts])
+                result = self._parse_json(response.text)
+                
+                return AnalyzedContent(
+                    content_type=ContentType.VIDEO, user_id=user_id,
+                    extracted_text=result.get("transcription"),
+                    claims=result.get("claims", [])
+                )
+            except Exception as e:
+                logger.error(f"Erreur video: {e}")
+                raise
+        
         prompt = """Transcris et analyse. JSON: {"transcription": "...", "claims": ["..."]}"""
         return await self._analyze_media(video_path, user_id, ContentType.VIDEO, prompt)
     
-    async def analyze_audio(self, audio_path: Path, user_id: str) -> AnalyzedContent:
+    async def analyze_audio(self, audio_path: Union[Path, bytes], user_id: str,
+                            mime_type: Optional[str] = None) -> AnalyzedContent:
         """
         Analyse un fichier audio (transcription)
         
         Args:
-            audio_path: Chemin vers l'audio
+            audio_path: Chemin vers l'audio (ou contenu en mémoire)
             user_id: ID de l'utilisateur
+            mime_type: Type MIME (requis pour un contenu en mémoire)
             
         Returns:
             Contenu analysé
         """
-        logger.info(f"Analyse audio pour user {user_id}: {audio_path}")
+        logger.info(f"Analyse audio pour user {user_id}: {self._describe(audio_path)}")
         
         prompt = """Transcris et trouve affirmations. JSON: {"transcription": "...", "claims": ["..."]}"""
-        return await self._analyze_media(audio_path, user_id, ContentType.AUDIO, prompt)
+        return await self._analyze_media(audio_path, user_id, ContentType.AUDIO, prompt, mime_type)
     
     async def extract_from_url(self, url: str, user_id: str) -> AnalyzedContent:
         """
@@ -143,11 +442,33 @@ JSON: {{"summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unkn
         """
         logger.info(f"Extraction URL pour user {user_id}: {url}")
         
+        analyzed = await self.inflight.do(f"url:{canonicalize_url(url)}",
+                                          lambda: self._extract_from_url(url, user_id))
+        return replace(analyzed, user_id=user_id, claims=list(analyzed.claims))
+    
+    async def _extract_from_url(self, url: str, user_id: str) -> AnalyzedContent:
+        if self.url_fetcher is not None:
+            try:
+                page = await self.url_fetcher.fetch(url)
+            except FetchError as e:
+                logger.warning(f"Page inaccessible: {e}")
+                return AnalyzedContent(content_type=ContentType.LINK, user_id=user_id)
+            
+            if not page.text:
+                return AnalyzedContent(content_type=ContentType.LINK, user_id=user_id)
+            # Pas de repli "texte brut = affirmation" : le texte d'une page n'est pas une affirmation
+            try:
+                analyzed = await self._text_analysis(page.text, user_id)
+            except Exception as e:
+                logger.error(f"Erreur URL: {e}")
+                raise
+            return replace(analyzed, content_type=ContentType.LINK,
+                           summary=analyzed.summary or page.title)
+        
         prompt = f"""Analyse {url}. JSON: {{"extracted_text": "...", "claims": ["..."]}}"""
         
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(self.executor, self.model.generate_content, prompt)
+            response = await self._generate(prompt)
             result = self._parse_json(response.text)
             
             return AnalyzedContent(
@@ -158,36 +479,22 @@ JSON: {{"summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unkn
         except Exception as e:
             logger.error(f"Erreur URL: {e}")
             raise
-    async def _analyze_media(self, path: Path, user_id: str, content_type: ContentType, prompt: str):
+    
+    async def _analyze_media(self, path: Union[Path, bytes], user_id: str, content_type: ContentType,
+                             prompt: str, mime_type: Optional[str] = None):
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Lire le fichier en bytes
-            def read_file():
-                with open(str(path), 'rb') as f:
-                    file_data = f.read()
-                
-                # Déterminer le mime_type
-                ext = path.suffix.lower()
-                mime_types = {
-                    '.mp3': 'audio/mpeg',
-                    '.ogg': 'audio/ogg',
-                    '.mp4': 'video/mp4',
-                    '.avi': 'video/x-msvideo',
-                    '.mov': 'video/quicktime'
-                }
-                mime_type = mime_types.get(ext, 'application/octet-stream')
-                
-                return {
-                    'mime_type': mime_type,
-                    'data': file_data
-                }
-            
-            file_data = await loop.run_in_executor(self.executor, read_file)
-            response = await loop.run_in_executor(
-                self.executor,
-                lambda: self.model.generate_content([prompt, file_data])
-            )
+            # Déterminer le mime_type
+            ext = path.suffix.lower() if isinstance(path, Path) else ""
+            mime_types = {
+                '.mp3': 'audio/mpeg',
+                '.ogg': 'audio/ogg',
+                '.mp4': 'video/mp4',
+                '.avi': 'video/x-msvideo',
+                '.mov': 'video/quicktime'
+            }
+            mime_type = mime_type or mime_types.get(ext, 'application/octet-stream')
+            async with self._media_part(path, mime_type) as file_data:
+                response = await self._generate([prompt, file_data])
             result = self._parse_json(response.text)
             
             return AnalyzedContent(
@@ -199,7 +506,12 @@ JSON: {{"summary": "...", "claims": ["..."], "claim_type": "factual|opinion|unkn
             logger.error(f"Erreur media: {e}")
             raise
     
-    def _parse_json(self, text: str) -> dict:
+    def _describe(self, media: Union[Path, bytes]) -> str:
+        if isinstance(media, (bytes, bytearray)):
+            return f"<mémoire {len(media) / 1024:.0f} KB>"
+        return str(media)
+    
+    def _parse_json(self, text: str) -> Union[dict, list]:
         cleaned = re.sub(r'^```json\s*|\s*```$', '', text.strip())
         try:
             return json.loads(cleaned)
@@ -0,0 +1,119 @@
+"""
+Cache des analyses de médias (images, vidéos, audio)
+
+Les médias transférés gardent le même `file_unique_id` Telegram : un hit évite
+le téléchargement et l'appel Gemini. Le hash du contenu sert de clé de repli
+pour les fichiers identiques envoyés séparément.
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from config.settings import settings
+from services.metrics import metrics
+from models.content import AnalyzedContent
+
+class MediaCache:
+    """Cache LRU borné de résultats `AnalyzedContent`"""
+    
+    def __init__(self, max_entries: int = 500):
+        """
+        Initialise le cache
+        
+        Args:
+            max_entries: Nombre max de clés conservées (éviction LRU)
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, AnalyzedContent] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    def lookup(self, key: Optional[str], user_id: str) -> Optional[AnalyzedContent]:
+        """
+        Cherche une analyse déjà faite
+        
+        Args:
+            key: `file_unique_id` ou hash du contenu
+            user_id: ID de l'utilisateur demandeur
+            
+        Returns:
+            Copie de l'analyse pour cet utilisateur, ou None
+        """
+        if not key or self.max_entries <= 0:
+            return None
+        
+        analyzed = self._entries.get(key)
+        if analyzed is None:
+            self.stats["misses"] += 1
+            metrics.cache_misses.inc("media")
+            return None
+        
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        metrics.cache_hits.inc("media")
+        return replace(analyzed, user_id=user_id, timestamp=datetime.now(), claims=list(analyzed.claims))
+    
+    def store(self, analyzed: AnalyzedContent, *keys: Optional[str]) -> None:
+        """
+        Enregistre une analyse sous une ou plusieurs clés
+        
+        Une analyse vide (ni affirmation ni texte, ex: réponse Gemini
+        illisible) n'est pas conservée : le prochain envoi la refera.
+        
+        Args:
+            analyzed: Résultat Gemini
+            keys: `file_unique_id`, hash du contenu...
+        """
+        if self.max_entries <= 0 or not (analyzed.has_claims() or analyzed.extracted_text):
+            return
+        
+        entry = replace(analyzed, file_path=None)
+        for key in keys:
+            if not key:
+                continue
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def get_stats(self) -> dict:
+        """Retourne les statistiques du cache"""
+        return {**self.stats, "entries": len(self._entries)}
+
+async def file_digest(path: Path) -> str:
+    """
+    Calcule le SHA-256 d'un fichier hors de la boucle d'événements
+    
+    Args:
+        path: Chemin du fichier
+        
+    Returns:
+        Hash hexadécimal préfixé
+    """
+    def compute():
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(block)
+        return h.hexdigest()
+    
+    return "sha256:" + await asyncio.to_thread(compute)
+
+def data_digest(data: bytes) -> str:
+    """
+    Calcule le SHA-256 d'un contenu en mémoire
+    
+    Args:
+        data: Contenu du fichier
+        
+    Returns:
+        Hash hexadécimal préfixé (même format que `file_digest`)
+    """
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+media_cache = MediaCache(max_entries=settings.media_cache_max_entries)
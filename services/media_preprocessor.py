@@ -0,0 +1,273 @@
+"""
+Préparation locale des médias avant envoi à Gemini
+
+Vidéos : extraction d'une piste audio mono bas débit et de quelques images
+clés réduites avec ffmpeg, envoyées à la place du fichier original.
+Images : décodage avec Pillow, réduction à une taille adaptée à l'OCR,
+suppression des métadonnées (EXIF, GPS) et réencodage en JPEG ou PNG.
+Audios : conversion mono 16 kHz et suppression des silences (détection
+d'activité vocale par énergie), réencodage Opus bas débit.
+"""
+import array
+import asyncio
+import io
+import logging
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from config.settings import settings
+from services.metrics import metrics
+
+logger = logging.getLogger("telegram_bot")
+
+# Octets avant/après préparation (pour mesurer le gain)
+stats = {"videos": 0, "video_fallbacks": 0, "video_bytes_in": 0, "video_bytes_out": 0,
+         "images": 0, "image_fallbacks": 0, "image_bytes_in": 0, "image_bytes_out": 0,
+         "audios": 0, "audio_fallbacks": 0, "audio_bytes_in": 0, "audio_bytes_out": 0,
+         "audio_seconds_in": 0.0, "audio_seconds_out": 0.0}
+
+# Détection d'activité vocale : trames de 30 ms en PCM 16 bits mono
+VAD_FRAME_MS = 30
+
+@dataclass
+class MediaPart:
+    """Morceau de média préparé, prêt à être envoyé inline"""
+    mime_type: str
+    data: bytes
+
+def _ffmpeg() -> Optional[str]:
+    return shutil.which(settings.ffmpeg_path)
+
+async def _run(*args: str, input: Optional[bytes] = None) -> bytes:
+    """Exécute une commande et retourne sa sortie standard (lève RuntimeError si échec)"""
+    process = await asyncio.create_subprocess_exec(
+        *args, stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(input), settings.ffmpeg_timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise RuntimeError(f"{Path(args[0]).name}: délai dépassé")
+    if process.returncode != 0:
+        raise RuntimeError(f"{Path(args[0]).name}: {stderr.decode(errors='replace').strip()[-300:]}")
+    return stdout
+
+async def _duration(path: Path) -> Optional[float]:
+    ffprobe = shutil.which(settings.ffprobe_path)
+    if not ffprobe:
+        return None
+    try:
+        output = await _run(ffprobe, "-v", "error", "-show_entries", "format=duration",
+                            "-of", "default=noprint_wrappers=1:nokey=1", str(path))
+        return float(output.decode().strip())
+    except (RuntimeError, ValueError):
+        return None
+
+async def prepare_video(path: Path) -> Optional[list[MediaPart]]:
+    """
+    Réduit une vidéo à une piste audio mono + quelques images clés
+
+    Args:
+        path: Chemin de la vidéo téléchargée
+
+    Returns:
+        Parties à envoyer à Gemini, ou None pour envoyer le fichier original
+        (ffmpeg absent, désactivé ou en échec)
+    """
+    ffmpeg = _ffmpeg()
+    if not settings.video_preprocess_enabled or not ffmpeg:
+        return None
+
+    stats["videos"] += 1
+    with metrics.stage("preprocess", "video"):
+        parts = await _prepare_video(ffmpeg, path)
+
+    if not parts:
+        stats["video_fallbacks"] += 1
+        logger.warning("Préparation vidéo échouée, envoi du fichier original")
+        return None
+
+    size_in = path.stat().st_size
+    size_out = sum(len(part.data) for part in parts)
+    stats["video_bytes_in"] += size_in
+    stats["video_bytes_out"] += size_out
+    metrics.payload_bytes.inc("video", "in", amount=size_in)
+    metrics.payload_bytes.inc("video", "out", amount=size_out)
+    logger.info(f"Vidéo préparée: {size_in / (1024*1024):.1f} MB -> {size_out / 1024:.0f} KB "
+                f"({len(parts)} parties)")
+    return parts
+
+async def _prepare_video(ffmpeg: str, path: Path) -> list[MediaPart]:
+    """Extraction de la piste audio et des images clés (parties obtenues, éventuellement aucune)"""
+    duration = await _duration(path)
+    interval = max(duration / settings.video_keyframes, 1.0) if duration else 10.0
+
+    with tempfile.TemporaryDirectory(dir=settings.temp_download_path) as work_dir:
+        work = Path(work_dir)
+        audio_path = work / "audio.ogg"
+
+        parts = []
+        try:
+            await _run(ffmpeg, "-v", "error", "-y", "-i", str(path), "-vn", "-ac", "1",
+                       "-ar", "16000", "-c:a", "libopus", "-b:a", settings.video_audio_bitrate,
+                       str(audio_path))
+            parts.append(MediaPart("audio/ogg", audio_path.read_bytes()))
+        except RuntimeError as e:
+            logger.info(f"Vidéo sans piste audio exploitable: {e}")
+
+        try:
+            await _run(ffmpeg, "-v", "error", "-y", "-i", str(path),
+                       "-vf", f"fps=1/{interval:.2f},scale={settings.video_keyframe_width}:-2",
+                       "-frames:v", str(settings.video_keyframes), "-q:v", "5",
+                       str(work / "frame_%02d.jpg"))
+            for frame in sorted(work.glob("frame_*.jpg")):
+                parts.append(MediaPart("image/jpeg", frame.read_bytes()))
+        except RuntimeError as e:
+            logger.info(f"Extraction d'images clés impossible: {e}")
+    return parts
+
+def _encode_image(data: bytes) -> MediaPart:
+    """
+    Décode, réduit et réencode une image (bloquant, exécuté hors boucle)
+
+    Le résultat réencodé est toujours envoyé, même s'il n'est pas plus petit :
+    l'original porte ses métadonnées (position GPS, appareil...).
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((settings.image_max_dimension, settings.image_max_dimension),
+                        Image.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            # Transparence : PNG (sans exif= ni pnginfo=, les métadonnées ne sont pas recopiées)
+            image.save(output, format="PNG", optimize=True)
+            mime_type = "image/png"
+        else:
+            image.convert("RGB").save(output, format="JPEG", quality=settings.image_jpeg_quality,
+                                      optimize=True)
+            mime_type = "image/jpeg"
+
+    return MediaPart(mime_type, output.getvalue())
+
+async def prepare_image(media: Union[Path, bytes]) -> Optional[MediaPart]:
+    """
+    Réduit et réencode une image avant envoi à Gemini
+
+    Args:
+        media: Chemin de l'image ou contenu en mémoire
+
+    Returns:
+        Image préparée (avec son type MIME), ou None pour envoyer l'original
+        (désactivé ou image illisible par Pillow)
+    """
+    if not settings.image_preprocess_enabled:
+        return None
+
+    data = await asyncio.to_thread(media.read_bytes) if isinstance(media, Path) else media
+    stats["images"] += 1
+    try:
+        with metrics.stage("preprocess", "image"):
+            part = await asyncio.to_thread(_encode_image, data)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        stats["image_fallbacks"] += 1
+        logger.warning(f"Préparation image impossible, envoi de l'original: {e}")
+        return None
+
+    stats["image_bytes_in"] += len(data)
+    stats["image_bytes_out"] += len(part.data)
+    metrics.payload_bytes.inc("image", "in", amount=len(data))
+    metrics.payload_bytes.inc("image", "out", amount=len(part.data))
+    logger.debug(f"Image préparée: {len(data) / 1024:.0f} KB -> {len(part.data) / 1024:.0f} KB "
+                 f"({part.mime_type})")
+    return part
+
+def _trim_silence(pcm: bytes, sample_rate: int) -> bytes:
+    """
+    Supprime les silences d'un PCM 16 bits mono (bloquant, exécuté hors boucle)
+
+    Les silences de début et de fin sont retirés, les silences internes sont
+    raccourcis à `audio_max_silence_ms`. Retourne le PCM inchangé si aucune
+    voix n'est détectée.
+    """
+    samples = array.array("h", pcm[:len(pcm) - len(pcm) % 2])
+    frame_size = sample_rate * VAD_FRAME_MS // 1000
+    threshold = settings.audio_silence_threshold ** 2 * frame_size
+    frames = [samples[i:i + frame_size] for i in range(0, len(samples), frame_size)]
+    voiced = [sum(x * x for x in frame) >= threshold * len(frame) / frame_size for frame in frames]
+    if not any(voiced):
+        return pcm
+
+    # Marge autour de la parole pour ne pas couper les attaques et fins de mots
+    padding = settings.audio_vad_padding_ms // VAD_FRAME_MS
+    speech = [any(voiced[max(i - padding, 0):i + padding + 1]) for i in range(len(frames))]
+
+    max_silence = settings.audio_max_silence_ms // VAD_FRAME_MS
+    first = speech.index(True)
+    last = len(speech) - 1 - speech[::-1].index(True)
+    kept = array.array("h")
+    silence = 0
+    for index in range(first, last + 1):
+        silence = 0 if speech[index] else silence + 1
+        if silence <= max_silence:
+            kept.extend(frames[index])
+    return kept.tobytes()
+
+async def prepare_audio(media: Union[Path, bytes]) -> Optional[MediaPart]:
+    """
+    Convertit un audio en mono 16 kHz sans silences, réencodé en Opus
+
+    Args:
+        media: Chemin de l'audio ou contenu en mémoire
+
+    Returns:
+        Audio préparé, ou None pour envoyer l'original (ffmpeg absent,
+        désactivé, en échec ou sans gain de taille)
+    """
+    ffmpeg = _ffmpeg()
+    if not settings.audio_preprocess_enabled or not ffmpeg:
+        return None
+
+    stats["audios"] += 1
+    rate = settings.audio_sample_rate
+    try:
+        with metrics.stage("preprocess", "audio"):
+            pcm, trimmed, encoded = await _prepare_audio(ffmpeg, media, rate)
+    except RuntimeError as e:
+        stats["audio_fallbacks"] += 1
+        logger.warning(f"Préparation audio impossible, envoi de l'original: {e}")
+        return None
+
+    size_in = media.stat().st_size if isinstance(media, Path) else len(media)
+    if not encoded or len(encoded) >= size_in:
+        return None
+
+    bytes_per_second = rate * 2
+    stats["audio_bytes_in"] += size_in
+    stats["audio_bytes_out"] += len(encoded)
+    stats["audio_seconds_in"] += len(pcm) / bytes_per_second
+    stats["audio_seconds_out"] += len(trimmed) / bytes_per_second
+    metrics.payload_bytes.inc("audio", "in", amount=size_in)
+    metrics.payload_bytes.inc("audio", "out", amount=len(encoded))
+    logger.info(f"Audio préparé: {size_in / 1024:.0f} KB -> {len(encoded) / 1024:.0f} KB, "
+                f"{len(pcm) / bytes_per_second:.1f}s -> {len(trimmed) / bytes_per_second:.1f}s")
+    return MediaPart("audio/ogg", encoded)
+
+async def _prepare_audio(ffmpeg: str, media: Union[Path, bytes], rate: int) -> tuple[bytes, bytes, bytes]:
+    """Décodage PCM, suppression des silences et réencodage (lève RuntimeError si échec)"""
+    is_path = isinstance(media, Path)
+    pcm = await _run(ffmpeg, "-v", "error", "-i", str(media) if is_path else "pipe:0",
+                     "-ac", "1", "-ar", str(rate), "-f", "s16le", "pipe:1",
+                     input=None if is_path else media)
+    trimmed = await asyncio.to_thread(_trim_silence, pcm, rate)
+    encoded = await _run(ffmpeg, "-v", "error", "-f", "s16le", "-ar", str(rate), "-ac", "1",
+                         "-i", "pipe:0", "-c:a", "libopus", "-b:a", settings.audio_bitrate,
+                         "-f", "ogg", "pipe:1", input=trimmed)
+    return pcm, trimmed, encoded
@@ -0,0 +1,201 @@
+"""
+Métriques du bot (histogrammes, compteurs, jauges) au format Prometheus
+
+Les durées sont mesurées par étape (téléchargement, préparation, Gemini,
+Vera, édition Telegram, total) et par type de contenu. Un petit serveur
+HTTP local expose `/metrics` pour le scraping.
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from utils.tracing import tracer
+
+logger = logging.getLogger("telegram_bot")
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in values)
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+    return "{" + pairs + "}"
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {value}"
+
+class Gauge(Counter):
+    """Valeur instantanée (fixée, incrémentée, ou calculée au scraping)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),
+                 collect: Optional[Callable[[], dict[tuple[str, ...], float]]] = None):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterator[str]:
+        if self.collect is not None:
+            try:
+                self.values = self.collect()
+            except Exception as e:
+                logger.debug(f"Jauge {self.name} indisponible: {e}")
+        yield from super().samples()
+
+class Histogram:
+    """Distribution de durées par tranches cumulées"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        # étiquettes -> (compte par tranche, somme, total)
+        self.values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        entry = self.values.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> Iterator[str]:
+        names = self.label_names + ("le",)
+        for labels, (counts, total, count) in self.values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket{_labels(names, labels + (str(bound),))} {bucket_count}"
+            yield f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {count}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {count}"
+
+class Metrics:
+    """Registre des métriques du process"""
+
+    def __init__(self):
+        self._metrics: list = []
+        self.stage_seconds = self.register(Histogram(
+            "bot_stage_duration_seconds", "Durée de chaque étape du traitement",
+            ("stage", "content_type")))
+        self.errors = self.register(Counter(
+            "bot_errors_total", "Erreurs par étape", ("stage", "content_type")))
+        self.cache_hits = self.register(Counter(
+            "bot_cache_hits_total", "Résultats servis depuis un cache", ("cache",)))
+        self.cache_misses = self.register(Counter(
+            "bot_cache_misses_total", "Recherches en cache infructueuses", ("cache",)))
+        self.rejections = self.register(Counter(
+            "bot_rejections_total", "Messages refusés ou traités sans analyse", ("reason",)))
+        self.inflight = self.register(Gauge(
+            "bot_inflight_messages", "Messages en cours de traitement", ("content_type",)))
+        self.payload_bytes = self.register(Counter(
+            "bot_media_payload_bytes_total", "Octets des médias avant/après préparation",
+            ("content_type", "phase")))
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    def register(self, metric):
+        """Ajoute une métrique ; une métrique du même nom (module réimporté) est remplacée"""
+        self._metrics = [m for m in self._metrics if m.name != metric.name]
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...],
+              collect: Callable[[], dict[tuple[str, ...], float]]) -> Gauge:
+        """Ajoute une jauge calculée au moment du scraping"""
+        return self.register(Gauge(name, help, labels, collect))
+
+    @contextmanager
+    def stage(self, stage: str, content_type: str) -> Iterator[None]:
+        """Mesure la durée d'une étape, compte ses erreurs et l'ajoute à la trace en cours"""
+        started = time.perf_counter()
+        try:
+            with tracer.span(stage, content_type=content_type):
+                yield
+        except Exception:
+            self.errors.inc(stage, content_type)
+            raise
+        finally:
+            self.stage_seconds.observe(stage, content_type, value=time.perf_counter() - started)
+
+    def render(self) -> str:
+        """Export au format texte Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    async def start_server(self, host: str, port: int) -> None:
+        """Démarre l'endpoint HTTP `/metrics` (port 0 = désactivé)"""
+        if not port or self._server is not None:
+            return
+        try:
+            self._server = await asyncio.start_server(self._handle, host, port)
+            logger.info(f"📈 Métriques sur http://{host}:{port}/metrics")
+        except OSError as e:
+            logger.warning(f"Serveur de métriques indisponible ({host}:{port}): {e}")
+
+    async def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.decode(errors="replace").split(" ")[1] if request_line else ""
+            if path.split("?")[0] == "/metrics":
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, IndexError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+def _executor_queue_depth() -> dict[tuple[str, ...], float]:
+    loop = asyncio.get_running_loop()
+    executor = getattr(loop, "_default_executor", None)
+    work_queue = getattr(executor, "_work_queue", None)
+    return {(): float(work_queue.qsize()) if work_queue is not None else 0.0}
+
+metrics = Metrics()
+metrics.gauge("bot_executor_queue_depth", "Tâches en attente dans l'exécuteur par défaut (to_thread)",
+              (), _executor_queue_depth)
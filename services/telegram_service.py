@@ -0,0 +1,117 @@
+"""
+Services Telegram : mise à jour progressive des messages de traitement
+"""
+import time
+import logging
+from typing import Optional
+
+from telegram import Message
+from telegram.error import RetryAfter, TelegramError
+
+from config.settings import settings
+from models.content import VeraResponse
+from services.metrics import metrics
+from services.vera_client import VeraClient
+from utils.formatters import MAX_MESSAGE_LENGTH, format_fact_check_response, format_verdicts, truncate_message
+
+logger = logging.getLogger("telegram_bot")
+
+class ProgressiveEditor:
+    """Édite un message au fil du streaming Vera, avec un débit d'éditions limité"""
+
+    def __init__(self, message: Message, content_summary: str, content_type: str,
+                 claims: list[str], min_interval: float = 1.5):
+        """
+        Initialise l'éditeur
+
+        Args:
+            message: Message "Traitement..." à éditer
+            content_summary: Résumé affiché en tête
+            content_type: Type de contenu (emoji)
+            claims: Affirmations en cours de vérification
+            min_interval: Délai minimal entre deux éditions (secondes)
+        """
+        self.message = message
+        self.content_summary = content_summary
+        self.content_type = content_type
+        self.claims = claims
+        self.min_interval = min_interval
+        self.parts = [""] * len(claims)
+        self._next_edit = 0.0
+        self._last_text: Optional[str] = None
+
+    async def push(self, index: int, delta: str) -> None:
+        """
+        Ajoute un fragment de verdict et édite le message si le délai est écoulé
+
+        Args:
+            index: Index de l'affirmation
+            delta: Fragment de texte reçu de Vera
+        """
+        self.parts[index] += delta
+        if time.monotonic() >= self._next_edit:
+            await self._edit()
+
+    def render(self) -> str:
+        """Construit l'aperçu du message en cours"""
+        partial = [VeraResponse(raw_response=part or "…", success=True) for part in self.parts]
+        text = format_fact_check_response(
+            self.content_summary, format_verdicts(partial), self.content_type, self.claims
+        )
+        return truncate_message(text + " ⏳", suffix="…⏳")
+
+    async def _edit(self) -> None:
+        text = self.render()
+        self._next_edit = time.monotonic() + self.min_interval
+        if text == self._last_text:
+            return
+        try:
+            await self.message.edit_text(text)
+            self._last_text = text
+        except RetryAfter as e:
+            self._next_edit = time.monotonic() + e.retry_after
+            logger.warning(f"Édition progressive limitée par Telegram ({e.retry_after}s)")
+        except TelegramError as e:
+            logger.debug(f"Édition progressive ignorée: {e}")
+
+async def verify_with_progress(processing_msg: Message, vera_client: VeraClient, user_id: str,
+                               claims: list[str], content_summary: str,
+                               content_type: str) -> list[VeraResponse]:
+    """
+    Vérifie les affirmations en affichant les verdicts au fil du streaming
+
+    Args:
+        processing_msg: Message de traitement à éditer
+        vera_client: Client Vera
+        user_id: ID de l'utilisateur
+        claims: Affirmations à vérifier
+        content_summary: Résumé du contenu
+        content_type: Type de contenu
+
+    Returns:
+        Réponses Vera, dans l'ordre des affirmations
+    """
+    with metrics.stage("vera", content_type):
+        if not settings.vera_stream_edits:
+            return await vera_client.verify_claims(user_id, claims, settings.vera_claims_concurrency)
+
+        editor = ProgressiveEditor(processing_msg, content_summary, content_type, claims,
+                                   settings.vera_stream_edit_interval)
+        return await vera_client.verify_claims(user_id, claims, settings.vera_claims_concurrency,
+                                               on_delta=editor.push)
+
+async def edit_final_response(processing_msg: Message, response: str, content_type: str,
+                              footer: str = "") -> None:
+    """
+    Remplace le message de traitement par la réponse finale, coupée à la limite Telegram
+
+    Args:
+        processing_msg: Message de traitement à éditer
+        response: Réponse formatée (coupée en premier si trop longue)
+        content_type: Type de contenu (métriques)
+        footer: Texte conservé en fin de message (sources...), au plus la moitié du message
+    """
+    footer = truncate_message(footer, MAX_MESSAGE_LENGTH // 2) if footer else ""
+    text = truncate_message(response, MAX_MESSAGE_LENGTH - len(footer)) + footer
+    with metrics.stage("telegram_edit", content_type):
+        await processing_msg.edit_text(text)
@@ -0,0 +1,313 @@
+"""
+Récupération des pages web liées (client httpx partagé)
+
+Téléchargement borné en taille et en temps, extraction du texte lisible des
+pages HTML hors de la boucle d'événements, et cache par URL canonique
+revalidé avec ETag / Last-Modified. Les adresses internes (loopback, réseaux
+privés, link-local...) sont refusées, y compris après une redirection.
+"""
+import asyncio
+import ipaddress
+import logging
+import re
+import socket
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Optional
+
+import httpcore
+import httpx
+
+from services.metrics import metrics
+from utils.normalizers import canonicalize_url
+
+logger = logging.getLogger("telegram_bot")
+
+USER_AGENT = "Mozilla/5.0 (compatible; FactCheckBot/1.0)"
+
+@dataclass
+class FetchedPage:
+    """Texte lisible d'une page web"""
+    url: str
+    title: Optional[str]
+    text: str
+    truncated: bool = False
+
+class FetchError(Exception):
+    """Page inaccessible ou inexploitable"""
+    pass
+
+class BlockedAddressError(httpcore.ConnectError):
+    """Hôte résolu vers une adresse interne (protection SSRF)"""
+    pass
+
+# NAT64 (RFC 6052) : l'IPv4 cible est dans les 32 derniers bits
+NAT64_PREFIX = ipaddress.ip_network("64:ff9b::/96")
+
+def _embedded_ipv4(ip: ipaddress.IPv6Address) -> Optional[ipaddress.IPv4Address]:
+    """IPv4 encapsulée dans une IPv6 (mappée, 6to4, NAT64, Teredo), sinon None"""
+    if ip.ipv4_mapped:
+        return ip.ipv4_mapped
+    if ip.sixtofour:
+        return ip.sixtofour
+    if ip in NAT64_PREFIX:
+        return ipaddress.IPv4Address(int(ip) & 0xFFFFFFFF)
+    if ip.teredo:
+        return ip.teredo[1]
+    return None
+
+def is_public_address(address: str) -> bool:
+    """Indique si une IP est joignable publiquement (ni loopback, privée, CGNAT, link-local, réservée...)"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address):
+        ip = _embedded_ipv4(ip) or ip
+    return ip.is_global and not ip.is_multicast
+
+async def _resolve(host: str, port: int) -> list[str]:
+    """Adresses IP de l'hôte (dans l'ordre de getaddrinfo, sans doublons)"""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+class _PublicOnlyBackend(httpcore.AsyncNetworkBackend):
+    """
+    Résout l'hôte à la connexion et se connecte à l'IP validée
+
+    La résolution et la connexion utilisent la même adresse : un DNS qui change
+    de réponse entre les deux (DNS rebinding) ne contourne pas la vérification.
+    Host et SNI restent ceux de l'URL (fixés par httpcore, pas par cette couche).
+    """
+
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options=None):
+        try:
+            addresses = await _resolve(host, port)
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(f"Résolution impossible de {host}: {e}") from e
+        blocked = [address for address in addresses if not is_public_address(address)]
+        if blocked or not addresses:
+            raise BlockedAddressError(f"Adresse interne refusée pour {host}: {blocked[0] if blocked else '-'}")
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout=timeout,
+                                                       local_address=local_address,
+                                                       socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options=None):
+        raise BlockedAddressError("Socket unix refusé")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+class _PublicOnlyTransport(httpx.AsyncHTTPTransport):
+    """Transport dont chaque connexion (redirections comprises) passe par `_PublicOnlyBackend`"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # httpx 0.26 n'expose pas network_backend : on le fixe sur le pool httpcore
+        self._pool._network_backend = _PublicOnlyBackend()
+
+class _ReadableText(HTMLParser):
+    """Extrait titre et texte visible, sans scripts, menus ni pieds de page"""
+
+    SKIP = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form",
+            "iframe", "template", "button", "select"}
+    BLOCKS = {"p", "div", "section", "article", "main", "li", "h1", "h2", "h3", "h4", "h5",
+              "h6", "blockquote", "br", "tr", "td", "pre", "figcaption"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.parts: list[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title = (self.title or "") + data.strip()
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+def extract_readable_text(html: str) -> tuple[Optional[str], str]:
+    """
+    Extrait le titre et le texte lisible d'une page HTML (bloquant)
+
+    Returns:
+        (titre, texte) avec les lignes vides et espaces superflus retirés
+    """
+    parser = _ReadableText()
+    parser.feed(html)
+    parser.close()
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parser.parts).split("\n"))
+    # Les lignes très courtes (liens isolés, boutons) sont rarement du contenu
+    text = "\n".join(line for line in lines if len(line) > 1)
+    return parser.title or None, text
+
+class UrlFetcher:
+    """Récupère le texte des pages web avec un pool de connexions et un cache"""
+
+    def __init__(self, timeout: float = 10.0, max_bytes: int = 2 * 1024 * 1024,
+                 max_connections: int = 20, max_entries: int = 500, max_redirects: int = 5,
+                 max_chars: int = 50000, allow_private: bool = False):
+        """
+        Initialise le fetcher
+
+        Args:
+            timeout: Durée max d'un téléchargement complet (secondes)
+            max_bytes: Taille max lue par page (le reste est ignoré)
+            max_connections: Connexions simultanées max
+            max_entries: Nombre de pages gardées en cache
+            max_redirects: Redirections suivies au plus par page
+            max_chars: Taille max du texte extrait (le reste est ignoré)
+            allow_private: Autorise les adresses internes (tests locaux uniquement)
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_redirects = max_redirects
+        self.max_chars = max_chars
+        self.allow_private = allow_private
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections // 2)
+        self._client: Optional[httpx.AsyncClient] = None
+        # URL canonique -> (ETag, Last-Modified, page)
+        self._cache: OrderedDict[str, tuple[Optional[str], Optional[str], FetchedPage]] = OrderedDict()
+        self.stats = {"fetches": 0, "not_modified": 0, "errors": 0, "truncated": 0, "bytes": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé, créé au premier appel"""
+        if self._client is None or self._client.is_closed:
+            transport_class = httpx.AsyncHTTPTransport if self.allow_private else _PublicOnlyTransport
+            self._client = httpx.AsyncClient(
+                transport=transport_class(limits=self.limits, http2=True),
+                timeout=self.timeout, follow_redirects=True, max_redirects=self.max_redirects,
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,text/plain;q=0.9,*/*;q=0.1"}
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de téléchargements et de revalidations"""
+        return {**self.stats, "cached_pages": len(self._cache)}
+
+    async def fetch(self, url: str) -> FetchedPage:
+        """
+        Télécharge une page et en extrait le texte lisible
+
+        Args:
+            url: URL de la page
+
+        Returns:
+            Page extraite (depuis le cache si le serveur répond 304)
+
+        Raises:
+            FetchError si la page est inaccessible, trop lente ou d'un type non textuel
+        """
+        key = canonicalize_url(url)
+        cached = self._cache.get(key)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        self.stats["fetches"] += 1
+        try:
+            # URL telle qu'envoyée (ordre et forme des paramètres conservés) ;
+            # la forme canonique ne sert que de clé de cache
+            status, response_headers, body, truncated = await asyncio.wait_for(
+                self._download(url.strip(), headers), self.timeout
+            )
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            self.stats["errors"] += 1
+            raise FetchError(f"{key}: {type(e).__name__} {e}") from e
+
+        if status == 304 and cached:
+            self.stats["not_modified"] += 1
+            metrics.cache_hits.inc("url")
+            self._cache.move_to_end(key)
+            return cached[2]
+        if status >= 400:
+            self.stats["errors"] += 1
+            raise FetchError(f"{key}: HTTP {status}")
+
+        content_type = response_headers.get("content-type", "")
+        charset = re.search(r"charset=([\w-]+)", content_type)
+        try:
+            text = body.decode(charset.group(1) if charset else "utf-8", errors="replace")
+        except LookupError:
+            text = body.decode("utf-8", errors="replace")
+        if "html" in content_type or not content_type:
+            title, text = await asyncio.to_thread(extract_readable_text, text)
+        elif content_type.startswith("text/"):
+            title = None
+        else:
+            self.stats["errors"] += 1
+            raise FetchError(f"{key}: type non textuel ({content_type.split(';')[0]})")
+
+        text = text.strip()
+        if len(text) > self.max_chars:
+            # Comme document_max_chars : borne le nombre de morceaux analysés ensuite
+            text = text[:self.max_chars]
+            if not truncated:
+                self.stats["truncated"] += 1
+            truncated = True
+        page = FetchedPage(url=key, title=title, text=text, truncated=truncated)
+        etag = response_headers.get("etag")
+        last_modified = response_headers.get("last-modified")
+        if etag or last_modified:
+            self._cache[key] = (etag, last_modified, page)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return page
+
+    async def _download(self, url: str, headers: dict) -> tuple[int, httpx.Headers, bytes, bool]:
+        """Lit la réponse en streaming en s'arrêtant à max_bytes"""
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 or response.status_code >= 400:
+                return response.status_code, response.headers, b"", False
+
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.max_bytes:
+                    del body[self.max_bytes:]
+                    truncated = True
+                    self.stats["truncated"] += 1
+                    break
+            self.stats["bytes"] += len(body)
+            return response.status_code, response.headers, bytes(body), truncated
@@ -1,46 +1,140 @@
 """
 Client pour l'API Vera (fact-checking)
 """
+import asyncio
 import httpx
 import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 from models.content import VeraRequest, VeraResponse
+from services.verdict_cache import VerdictCache
+from utils.normalizers import normalize_claim
+from utils.singleflight import SingleFlight
+from utils.tracing import tracer
 
 logger = logging.getLogger("telegram_bot")
 
 class VeraClient:
-    def __init__(self, api_url: str, api_key: str, timeout: int = 60):
+    def __init__(self, api_url: str, api_key: str, timeout: int = 60,
+                 http2: bool = True, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, keepalive_expiry: float = 60.0,
+                 cache: Optional[VerdictCache] = None):
         self.api_url = api_url
         self.timeout = timeout
         self.headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
-    
-    async def verify_claim(self, user_id: str, query: str) -> VeraResponse:
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache
+        # Vérifications identiques en cours partagées entre utilisateurs
+        self.inflight = SingleFlight()
+        # Compteurs de réutilisation des connexions (requêtes vs connexions TCP ouvertes)
+        self.stats = {"requests": 0, "connections_opened": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé (keep-alive, HTTP/2), créé au premier appel"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, http2=self.http2, limits=self.limits, headers=self.headers
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def get_stats(self) -> dict:
+        """Retourne les compteurs de requêtes et de connexions réutilisées"""
+        requests = self.stats["requests"]
+        opened = self.stats["connections_opened"]
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": max(requests - opened, 0),
+            "reuse_ratio": (requests - opened) / requests if requests else 0.0,
+            "coalesced": self.inflight.stats["coalesced"],
+        }
+
+    async def _trace(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.stats["connections_opened"] += 1
+
+    async def stream_claim(self, user_id: str, query: str) -> AsyncIterator[str]:
+        """Produit les fragments de texte de Vera au fil de leur arrivée (lève les erreurs httpx)"""
         request = VeraRequest(user_id=user_id, query=query)
-        
+        self.stats["requests"] += 1
+        async with self.client.stream("POST", self.api_url, json=request.to_dict(),
+                                      extensions={"trace": self._trace}) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_text():
+                if chunk:
+                    yield chunk
+
+    async def verify_claim(self, user_id: str, query: str,
+                           on_delta: Optional[Callable[[str], Awaitable[None]]] = None) -> VeraResponse:
+        # Les doublons en cours reçoivent le verdict final (sans streaming)
+        return await self.inflight.do(normalize_claim(query),
+                                      lambda: self._verify_claim(user_id, query, on_delta))
+
+    async def _verify_claim(self, user_id: str, query: str,
+                            on_delta: Optional[Callable[[str], Awaitable[None]]] = None) -> VeraResponse:
+        if self.cache is not None:
+            cached = await self.cache.get(query)
+            if cached is not None:
+                if on_delta:
+                    await on_delta(cached)
+                return VeraResponse(raw_response=cached, success=True, cached=True)
+
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream("POST", self.api_url, 
-                                        json=request.to_dict(), headers=self.headers) as response:
-                    response.raise_for_status()
-                    chunks = [chunk async for chunk in response.aiter_text() if chunk]
-                    return VeraResponse(raw_response="".join(chunks), success=True)
+            chunks = []
+            with tracer.span("vera.stream"):
+                async for chunk in self.stream_claim(user_id, query):
+                    chunks.append(chunk)
+                    if on_delta:
+                        await on_delta(chunk)
+            raw_response = "".join(chunks)
+            if self.cache is not None and raw_response:
+                await self.cache.set(query, raw_response)
+            return VeraResponse(raw_response=raw_response, success=True)
         except httpx.HTTPStatusError as e:
             return self._handle_error(e.response.status_code)
         except Exception as e:
             logger.error(f"Erreur Vera: {e}")
             return VeraResponse(raw_response="", success=False, error_message=str(e))
-    
+
+    async def verify_claims(self, user_id: str, queries: list[str], max_concurrency: int = 2,
+                            on_delta: Optional[Callable[[int, str], Awaitable[None]]] = None
+                            ) -> list[VeraResponse]:
+        """Vérifie plusieurs affirmations en parallèle (concurrence bornée), dans l'ordre"""
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def verify(index: int, query: str) -> VeraResponse:
+            async def forward(delta: str) -> None:
+                await on_delta(index, delta)
+
+            async with semaphore:
+                return await self.verify_claim(user_id, query, forward if on_delta else None)
+
+        return list(await asyncio.gather(*(verify(i, query) for i, query in enumerate(queries))))
+
     def _handle_error(self, code: int) -> VeraResponse:
         msgs = {401: "API key invalide", 429: "Trop de requêtes", 500: "Erreur serveur"}
-        return VeraResponse(raw_response="", success=False, 
+        return VeraResponse(raw_response="", success=False,
                           error_message=msgs.get(code, f"Erreur {code}"))
-    
+
     async def health_check(self) -> bool:
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.post(self.api_url, 
-                                     json={"userId": "test", "query": "test"}, 
-                                     headers=self.headers)
-                return r.status_code in [200, 422]
+            self.stats["requests"] += 1
+            r = await self.client.post(self.api_url,
+                                       json={"userId": "test", "query": "test"},
+                                       timeout=5.0, extensions={"trace": self._trace})
+            return r.status_code in [200, 422]
         except:
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,138 @@
+"""
+Cache des verdicts Vera pour les affirmations déjà vérifiées
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from services.metrics import metrics
+from utils.normalizers import normalize_claim
+
+logger = logging.getLogger("telegram_bot")
+
+class VerdictCache:
+    """Cache à deux niveaux : LRU en mémoire avec TTL + SQLite optionnel"""
+    
+    def __init__(self, max_entries: int = 2000, ttl_seconds: int = 21600,
+                 db_path: Optional[Path] = None):
+        """
+        Initialise le cache
+        
+        Args:
+            max_entries: Nombre max d'entrées en mémoire
+            ttl_seconds: Durée de validité d'un verdict
+            db_path: Fichier SQLite (None = mémoire uniquement)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        
+        if db_path:
+            db_path = Path(db_path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts "
+                "(key TEXT PRIMARY KEY, verdict TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Cache verdicts SQLite: {db_path}")
+    
+    async def get(self, claim: str) -> Optional[str]:
+        """
+        Cherche un verdict pour une affirmation
+        
+        Args:
+            claim: Affirmation (brute, normalisée ici)
+            
+        Returns:
+            Verdict en cache ou None
+        """
+        key = normalize_claim(claim)
+        now = time.time()
+        
+        entry = self._memory.get(key)
+        if entry:
+            expires_at, verdict = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                metrics.cache_hits.inc("verdict")
+                return verdict
+            del self._memory[key]
+        
+        if self._db is not None:
+            row = await asyncio.to_thread(self._db_get, key, now)
+            if row:
+                expires_at, verdict = row
+                self._remember(key, verdict, expires_at)
+                self.stats["disk_hits"] += 1
+                metrics.cache_hits.inc("verdict")
+                return verdict
+        
+        self.stats["misses"] += 1
+        metrics.cache_misses.inc("verdict")
+        return None
+    
+    async def set(self, claim: str, verdict: str) -> None:
+        """
+        Enregistre un verdict
+        
+        Args:
+            claim: Affirmation vérifiée
+            verdict: Réponse Vera
+        """
+        key = normalize_claim(claim)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, verdict, expires_at)
+        self.stats["stores"] += 1
+        
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, verdict, expires_at)
+    
+    def get_stats(self) -> dict:
+        """Retourne les statistiques hit/miss"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return {**self.stats, "entries": len(self._memory),
+                "hit_ratio": hits / total if total else 0.0}
+    
+    def close(self) -> None:
+        """Ferme la base SQLite"""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+    
+    def _remember(self, key: str, verdict: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, verdict)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _db_get(self, key: str, now: float) -> Optional[tuple[float, str]]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, verdict FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] <= now:
+                self._db.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            return row
+    
+    def _db_set(self, key: str, verdict: str, expires_at: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, expires_at) VALUES (?, ?, ?)",
+                (key, verdict, expires_at)
+            )
+            self._db.commit()
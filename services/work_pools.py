@@ -0,0 +1,90 @@
+"""
+Pools de travail par classe de coût (texte, image, audio, vidéo)
+
+Chaque classe a sa propre limite de concurrence et une file d'attente bornée :
+une rafale de vidéos ne bloque plus les vérifications de texte, et le bot
+refuse le travail au-delà de la file au lieu de l'accumuler.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from config.settings import settings
+from services.metrics import metrics
+
+class PoolFullError(Exception):
+    """File d'attente pleine pour cette classe de contenu"""
+    pass
+
+class WorkPool:
+    """Limite de concurrence + file d'attente bornée pour une classe de contenu"""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        """
+        Initialise le pool
+
+        Args:
+            name: Nom de la classe (text, image, audio, video)
+            concurrency: Nombre de traitements simultanés
+            max_queue: Nombre max de traitements en attente
+        """
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.stats = {"accepted": 0, "queued": 0, "rejected": 0}
+
+    @asynccontextmanager
+    async def slot(self, on_queued: Optional[Callable[[int], Awaitable[None]]] = None
+                   ) -> AsyncIterator[None]:
+        """
+        Réserve une place de traitement
+
+        Args:
+            on_queued: Appelé avec la position en file si le pool est saturé
+
+        Raises:
+            PoolFullError si la file d'attente est pleine
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise PoolFullError(self.name)
+
+            self.waiting += 1
+            self.stats["queued"] += 1
+            try:
+                if on_queued:
+                    await on_queued(self.waiting)
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.stats["accepted"] += 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def get_stats(self) -> dict:
+        """Retourne l'état du pool"""
+        return {**self.stats, "active": self.active, "waiting": self.waiting,
+                "concurrency": self.concurrency, "max_queue": self.max_queue}
+
+work_pools = {
+    "text": WorkPool("text", settings.pool_text_concurrency, settings.pool_text_queue),
+    "image": WorkPool("image", settings.pool_image_concurrency, settings.pool_image_queue),
+    "audio": WorkPool("audio", settings.pool_audio_concurrency, settings.pool_audio_queue),
+    "video": WorkPool("video", settings.pool_video_concurrency, settings.pool_video_queue),
+}
+
+metrics.gauge("bot_pool_active", "Traitements en cours par pool", ("pool",),
+              lambda: {(name,): pool.active for name, pool in work_pools.items()})
+metrics.gauge("bot_pool_waiting", "Traitements en file d'attente par pool", ("pool",),
+              lambda: {(name,): pool.waiting for name, pool in work_pools.items()})
@@ -0,0 +1,164 @@
+"""
+Mode multi-process : un process d'ingestion, N process workers
+
+Le process d'ingestion reçoit les updates (polling ou webhook) et les répartit
+par chat sur des files `multiprocessing` ; chaque worker exécute le pipeline
+complet des handlers avec ses propres clients Gemini/Vera. Un même chat va
+toujours au même worker, qui traite ses updates dans l'ordre.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+
+from config.settings import settings
+from services.metrics import metrics
+from utils.formatters import format_error_message
+from utils.logger import setup_logger
+
+logger = logging.getLogger("telegram_bot")
+
+class WorkerPool:
+    """Process workers alimentés par le process d'ingestion"""
+
+    def __init__(self, processes: int, queue_size: int = 1000, start_timeout: float = 120):
+        """
+        Initialise le pool (les process sont lancés par `start`)
+
+        Args:
+            processes: Nombre de process workers
+            queue_size: Taille max de la file de chaque worker
+            start_timeout: Délai max pour qu'un worker se déclare prêt (secondes)
+        """
+        self.processes = processes
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self.queues = [self._context.Queue(maxsize=queue_size) for _ in range(processes)]
+        self.workers: list[multiprocessing.Process] = []
+        self.stats = {"dispatched": 0, "rejected": 0}
+
+    async def start(self, application: Optional[Application] = None) -> None:
+        """
+        Lance les process workers et attend qu'ils soient prêts (utilisable comme `post_init`)
+
+        Raises:
+            RuntimeError si un worker s'arrête ou ne se déclare pas prêt à temps
+            (tous les workers sont alors arrêtés)
+        """
+        await metrics.start_server(settings.metrics_host, settings.metrics_port)
+        ready_events = []
+        for index, worker_queue in enumerate(self.queues):
+            ready = self._context.Event()
+            process = self._context.Process(target=worker_main, args=(index, worker_queue, ready),
+                                            name=f"bot-worker-{index}", daemon=True)
+            process.start()
+            self.workers.append(process)
+            ready_events.append(ready)
+        
+        for index, (process, ready) in enumerate(zip(self.workers, ready_events)):
+            if not await asyncio.to_thread(wait_ready, process, ready, self.start_timeout):
+                for worker in self.workers:
+                    worker.terminate()
+                await metrics.stop_server()
+                raise RuntimeError(f"Worker {index} non prêt après {self.start_timeout:.0f}s "
+                                   f"(code de sortie: {process.exitcode})")
+        logger.info(f"✅ {self.processes} workers lancés")
+
+    async def stop(self, application: Optional[Application] = None) -> None:
+        """Arrête les workers après vidage de leur file (utilisable comme `post_shutdown`)"""
+        for worker_queue in self.queues:
+            await asyncio.to_thread(worker_queue.put, None)
+        for process in self.workers:
+            await asyncio.to_thread(process.join, 30)
+            if process.is_alive():
+                process.terminate()
+        await metrics.stop_server()
+        logger.info(f"Workers arrêtés: {self.stats}")
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Envoie l'update au worker de son chat (ordre préservé par chat)"""
+        key = update.effective_chat.id if update.effective_chat else update.update_id
+        worker_queue = self.queues[key % self.processes]
+        try:
+            worker_queue.put_nowait(json.dumps(update.to_dict()))
+            self.stats["dispatched"] += 1
+        except queue.Full:
+            self.stats["rejected"] += 1
+            metrics.rejections.inc("worker_queue_full")
+            logger.warning(f"File du worker {key % self.processes} pleine, update refusé")
+            if update.effective_message:
+                await update.effective_message.reply_text(format_error_message("overloaded"))
+
+def wait_ready(process: multiprocessing.Process, ready, timeout: float) -> bool:
+    """Attend qu'un worker se déclare prêt (bloquant) ; False s'il s'arrête ou dépasse le délai"""
+    deadline = time.monotonic() + timeout
+    while not ready.wait(0.5):
+        if not process.is_alive() or time.monotonic() >= deadline:
+            return False
+    return True
+
+def worker_main(index: int, worker_queue: multiprocessing.Queue, ready) -> None:
+    """Point d'entrée d'un process worker"""
+    try:
+        asyncio.run(_run_worker(index, worker_queue, ready))
+    except KeyboardInterrupt:
+        pass
+
+async def _run_worker(index: int, worker_queue: multiprocessing.Queue, ready) -> None:
+    # Chaque worker écrit ses logs dans son propre fichier : plusieurs process
+    # ne peuvent pas faire tourner le même logs/bot.log. À faire avant l'import
+    # de main, qui journalise déjà.
+    setup_logger(log_level=settings.log_level, use_queue=settings.log_queue,
+                 json_format=settings.log_json, max_bytes=settings.log_max_bytes,
+                 backup_count=settings.log_backup_count, log_file=f"bot.worker{index}.log")
+
+    # Import local : main importe ce module pour le process d'ingestion
+    from main import build_application
+
+    # Chaque worker expose ses métriques sur son propre port
+    if settings.metrics_port:
+        settings.metrics_port += index + 1
+    # ... et écrit ses traces dans son propre fichier
+    if settings.trace_export_path:
+        path = settings.trace_export_path
+        settings.trace_export_path = path.with_name(f"{path.stem}.worker{index}{path.suffix}")
+    application = build_application(with_updater=False)
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    logger.info(f"Worker {index} prêt")
+    ready.set()
+
+    loop = asyncio.get_running_loop()
+    chat_tails: dict[int, asyncio.Task] = {}
+
+    async def process_in_order(update: Update, previous: Optional[asyncio.Task]) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        await application.process_update(update)
+
+    while True:
+        data = await loop.run_in_executor(None, worker_queue.get)
+        if data is None:
+            break
+
+        update = Update.de_json(json.loads(data), application.bot)
+        key = update.effective_chat.id if update.effective_chat else update.update_id
+        task = asyncio.create_task(process_in_order(update, chat_tails.get(key)))
+        chat_tails[key] = task
+        task.add_done_callback(
+            lambda t, key=key: chat_tails.pop(key, None) if chat_tails.get(key) is t else None
+        )
+
+    if chat_tails:
+        await asyncio.wait(list(chat_tails.values()))
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+    await application.shutdown()
+    logger.info(f"Worker {index} arrêté")
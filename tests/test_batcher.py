@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from utils.batcher import MicroBatcher
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 10 if item >= 0 else ValueError(f"négatif: {item}") for item in items]
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, window_seconds=10, max_items=3)
+
+    async def scenario():
+        started = time.monotonic()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert results == [0, 10, 20]
+    assert handler.batches == [[0, 1, 2]]
+    assert elapsed < 1
+
+def test_partial_batch_is_sent_when_the_window_ends():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, window_seconds=0.05, max_items=10)
+
+    async def scenario():
+        first = asyncio.create_task(batcher.submit(1))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        assert handler.batches == []
+        results = await asyncio.gather(first, second)
+        # Après la fenêtre : nouveau lot
+        return results, await batcher.submit(3)
+
+    results, late = asyncio.run(scenario())
+    assert results == [10, 20] and late == 30
+    assert handler.batches == [[1, 2], [3]]
+    assert batcher.get_stats()["avg_batch"] == 1.5
+
+def test_errors_reach_only_their_caller():
+    batcher = MicroBatcher(Recorder(), window_seconds=0.01, max_items=2)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(-1), return_exceptions=True)
+
+    ok, error = asyncio.run(scenario())
+    assert ok == 10
+    assert isinstance(error, ValueError)
+
+def test_handler_failure_reaches_every_caller():
+    async def failing(items):
+        raise RuntimeError("lot en échec")
+
+    batcher = MicroBatcher(failing, window_seconds=0.01, max_items=5)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(scenario()))
+
+def test_cancelled_batch_fails_its_callers():
+    started = asyncio.Event()
+
+    async def slow(items):
+        started.set()
+        await asyncio.sleep(10)
+        return items
+
+    batcher = MicroBatcher(slow, window_seconds=0.01, max_items=2)
+
+    async def scenario():
+        callers = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+        await started.wait()
+        for task in list(batcher._tasks):
+            task.cancel()
+        done, _ = await asyncio.wait(callers, timeout=1)
+        return [task.exception() for task in done], len(callers)
+
+    errors, total = asyncio.run(scenario())
+    assert len(errors) == total
+    assert all(isinstance(error, RuntimeError) for error in errors)
@@ -0,0 +1,37 @@
+from utils.chunking import split_text
+
+def paragraph(index: int, sentences: int = 8) -> str:
+    return " ".join(f"Phrase {index}.{i} sur un fait vérifiable de la section {index}." for i in range(sentences))
+
+def test_short_text_is_single_chunk():
+    assert split_text("Un texte court.", 6000, 300) == ["Un texte court."]
+
+def test_chunks_respect_max_size_and_keep_all_text():
+    text = "\n\n".join(paragraph(i) for i in range(40))
+    chunks = split_text(text, 6000, 300)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 6000 for chunk in chunks)
+    for i in range(40):
+        assert any(paragraph(i) in chunk for chunk in chunks)
+
+def test_overlap_with_paragraphs_longer_than_overlap():
+    text = "\n\n".join(paragraph(i) for i in range(40))
+    assert len(paragraph(0)) > 300
+    chunks = split_text(text, 6000, 300)
+    for previous, following in zip(chunks, chunks[1:]):
+        head = following.split("\n")[0]
+        assert head and len(head) <= 300
+        assert previous.endswith(head)
+
+def test_overlap_falls_back_to_whole_words():
+    text = "\n\n".join(" ".join(f"mot{i}x{j}" for j in range(200)) for i in range(6))
+    chunks = split_text(text, 2000, 100)
+    for previous, following in zip(chunks, chunks[1:]):
+        head = following.split("\n")[0]
+        assert head and len(head) <= 100
+        assert previous.endswith(" " + head)
+
+def test_no_overlap_when_disabled():
+    text = "\n\n".join(paragraph(i) for i in range(40))
+    chunks = split_text(text, 6000, 0)
+    assert sum(len(chunk) for chunk in chunks) == len(text.replace("\n\n", "\n")) - (len(chunks) - 1)
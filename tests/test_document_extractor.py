@@ -0,0 +1,24 @@
+from services import document_extractor
+from services.document_extractor import ExtractedDocument, _extract
+
+def fake_pdf(path, document):
+    """Page 1 texte, page 2 scannée, page 3 texte, page 4 scannée"""
+    for page in ("Page un.", None, "Page trois.", None):
+        document.pages += 1
+        if page is None:
+            document.scanned_pages.append(b"%PDF")
+        yield page
+
+def test_ocr_text_is_merged_in_page_order(monkeypatch, tmp_path):
+    monkeypatch.setitem(document_extractor.EXTRACTORS, "application/pdf", fake_pdf)
+    document = _extract(tmp_path / "scan.pdf", "application/pdf")
+    assert document.text == "Page un.\nPage trois."
+    assert document.with_ocr(["Page deux (OCR).", "Page quatre (OCR)."]) == (
+        "Page un.\nPage deux (OCR).\nPage trois.\nPage quatre (OCR).")
+
+def test_failed_ocr_pages_are_skipped():
+    document = ExtractedDocument(parts=["A", "B"], scanned_at=[0, 0, 2])
+    assert document.with_ocr(["ocr1", None, "ocr3"]) == "ocr1\nA\nB\nocr3"
+
+def test_doc_files_are_not_accepted():
+    assert not document_extractor.can_extract("application/msword")
@@ -0,0 +1,12 @@
+from utils.formatters import MAX_MESSAGE_LENGTH, truncate_message
+
+def test_short_message_is_unchanged():
+    assert truncate_message("Vérifié") == "Vérifié"
+
+def test_long_message_fits_telegram_limit():
+    text = truncate_message("x" * 10_000)
+    assert len(text) == MAX_MESSAGE_LENGTH
+    assert text.endswith("…")
+
+def test_custom_suffix_and_length():
+    assert truncate_message("abcdefghij", 6, suffix="…⏳") == "abcd…⏳"
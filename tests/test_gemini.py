@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from models.content import ContentType
+from services.gemini_client import GeminiClient
+from services.url_fetcher import FetchedPage
+
+class FailingModel:
+    async def generate_content_async(self, contents):
+        raise RuntimeError("Gemini indisponible")
+
+class StaticFetcher:
+    async def fetch(self, url):
+        return FetchedPage(url=url, title="Titre", text="Texte de la page " * 100)
+
+def make_client() -> GeminiClient:
+    client = GeminiClient("fake", "fake-model", url_fetcher=StaticFetcher())
+    client.model = FailingModel()
+    return client
+
+def test_text_falls_back_to_raw_text_as_claim():
+    analyzed = asyncio.run(make_client().analyze_text("Le chômage a baissé de 2 % en 2023.", "1"))
+    assert analyzed.content_type == ContentType.TEXT
+    assert analyzed.claims == ["Le chômage a baissé de 2 % en 2023."]
+
+def test_link_does_not_send_page_text_as_claim():
+    with pytest.raises(RuntimeError):
+        asyncio.run(make_client().extract_from_url("https://example.org/article", "1"))
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, contents):
+        self.calls += 1
+        return type("Response", (), {"text": '{"summary": "s", "claims": ["c%d"], "claim_type": "factual"}'
+                                     % self.calls})()
+
+def test_long_text_is_limited_to_max_chunks():
+    client = GeminiClient("fake", "fake-model", chunk_chars=1000, chunk_overlap=0, max_chunks=4)
+    client.model = CountingModel()
+    text = "\n\n".join(f"Paragraphe {i} : un fait vérifiable de plus. " * 10 for i in range(200))
+    analyzed = asyncio.run(client.analyze_text(text, "1"))
+    assert client.model.calls == 4
+    assert len(analyzed.claims) == 4
+    assert client.stats["chunks_skipped"] > 0
+
+class FakeFile:
+    def __init__(self, name, state="ACTIVE"):
+        self.name = name
+        self.state = type("State", (), {"name": state})()
+
+class FakeFilesAPI:
+    """Remplace upload_file / get_file / delete_file de google.generativeai"""
+
+    def __init__(self, monkeypatch, state="ACTIVE"):
+        self.state = state
+        self.deleted = []
+        self.count = 0
+        monkeypatch.setattr("services.gemini_client.genai.upload_file", self.upload_file)
+        monkeypatch.setattr("services.gemini_client.genai.get_file", lambda name: FakeFile(name, self.state))
+        monkeypatch.setattr("services.gemini_client.genai.delete_file", self.deleted.append)
+
+    def upload_file(self, path, mime_type):
+        self.count += 1
+        return FakeFile(f"files/{self.count}", self.state)
+
+def write_media(tmp_path, name, size=2048):
+    path = tmp_path / name
+    path.write_bytes(name.encode() * (size // len(name)))
+    return path
+
+def test_upload_in_use_is_not_deleted_when_evicted(tmp_path, monkeypatch):
+    files = FakeFilesAPI(monkeypatch)
+    client = GeminiClient("fake", "fake-model", upload_threshold_mb=0, max_uploads=1)
+
+    async def scenario():
+        async with client._media_part(write_media(tmp_path, "a.mp4"), "video/mp4") as first:
+            # Un second upload évince le premier du cache pendant son utilisation
+            async with client._media_part(write_media(tmp_path, "b.mp4"), "video/mp4"):
+                pass
+            assert files.deleted == []
+        assert files.deleted == [first.name]
+        await client.close()
+        assert files.deleted == [first.name, "files/2"]
+
+    asyncio.run(scenario())
+
+def test_upload_still_processing_falls_back_to_inline(tmp_path, monkeypatch):
+    files = FakeFilesAPI(monkeypatch, state="PROCESSING")
+    client = GeminiClient("fake", "fake-model", upload_threshold_mb=0, upload_processing_timeout=0)
+    path = write_media(tmp_path, "c.mp4")
+
+    async def scenario():
+        async with client._media_part(path, "video/mp4") as part:
+            return part
+
+    part = asyncio.run(scenario())
+    assert part == {"mime_type": "video/mp4", "data": path.read_bytes()}
+    assert files.deleted == ["files/1"]
+    assert client.stats["upload_timeouts"] == 1
+
+class SlowModel:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_content_async(self, contents):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return type("Response", (), {"text": '{"summary": "s", "claims": ["c"], "claim_type": "factual"}'})()
+
+def test_gemini_calls_respect_max_concurrency():
+    client = GeminiClient("fake", "fake-model", max_concurrency=2)
+    client.model = SlowModel()
+
+    async def scenario():
+        return await asyncio.gather(*(client.analyze_text(f"Affirmation numéro {i} à vérifier", "1")
+                                      for i in range(6)))
+
+    results = asyncio.run(scenario())
+    assert all(result.claims == ["c"] for result in results)
+    assert client.model.max_active == 2
+    assert client.stats["calls"] == 6
+    assert client.stats["queue_wait_max"] > 0
+
+def test_in_memory_media_is_sent_inline():
+    client = GeminiClient("fake", "fake-model", upload_threshold_mb=0)
+
+    async def scenario():
+        async with client._media_part(b"OggS audio", "audio/ogg") as part:
+            return part
+
+    assert asyncio.run(scenario()) == {"mime_type": "audio/ogg", "data": b"OggS audio"}
+    assert client.stats["uploads"] == 0
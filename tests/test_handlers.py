@@ -0,0 +1,38 @@
+import asyncio
+
+from services.telegram_service import edit_final_response
+from utils.formatters import MAX_MESSAGE_LENGTH, format_fact_check_response, format_verdicts
+from models.content import VeraResponse
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text):
+        if len(text) > MAX_MESSAGE_LENGTH:
+            raise ValueError("Message is too long")
+        self.edits.append(text)
+
+def long_response() -> str:
+    verdicts = [VeraResponse(raw_response="Verdict détaillé. " * 150, success=True) for _ in range(3)]
+    return format_fact_check_response("Résumé", format_verdicts(verdicts), "texte", ["A", "B", "C"])
+
+def test_final_response_fits_telegram_limit():
+    message = FakeMessage()
+    response = long_response()
+    assert len(response) > MAX_MESSAGE_LENGTH
+    asyncio.run(edit_final_response(message, response, "texte"))
+    assert len(message.edits[0]) <= MAX_MESSAGE_LENGTH
+    assert message.edits[0].startswith(response[:100])
+
+def test_footer_is_kept_when_response_is_cut():
+    message = FakeMessage()
+    footer = "\n\n🔗 Source: https://example.org/article"
+    asyncio.run(edit_final_response(message, long_response(), "lien", footer))
+    assert len(message.edits[0]) <= MAX_MESSAGE_LENGTH
+    assert message.edits[0].endswith(footer)
+
+def test_short_response_is_unchanged():
+    message = FakeMessage()
+    asyncio.run(edit_final_response(message, "✅ Vrai", "texte", "\n\nSource"))
+    assert message.edits == ["✅ Vrai\n\nSource"]
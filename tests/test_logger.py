@@ -0,0 +1,20 @@
+import io
+
+from utils.logger import _listeners, _stop_listener, setup_logger
+
+def test_each_logger_keeps_its_own_listener_and_file(tmp_path):
+    first = setup_logger("test_first", use_queue=True, stream=io.StringIO(), log_dir=tmp_path,
+                         log_file="first.log")
+    second = setup_logger("test_second", use_queue=True, stream=io.StringIO(), log_dir=tmp_path,
+                          log_file="second.log")
+    try:
+        assert {"test_first", "test_second"} <= set(_listeners)
+        first.info("premier")
+        second.info("second")
+    finally:
+        _stop_listener("test_first")
+        _stop_listener("test_second")
+
+    assert "premier" in (tmp_path / "first.log").read_text(encoding="utf-8")
+    assert "second" in (tmp_path / "second.log").read_text(encoding="utf-8")
+    assert "premier" not in (tmp_path / "second.log").read_text(encoding="utf-8")
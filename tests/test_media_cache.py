@@ -0,0 +1,25 @@
+import asyncio
+
+from models.content import AnalyzedContent, ContentType
+from services.media_cache import MediaCache, data_digest, file_digest
+
+def make(claims=None, extracted_text=None) -> AnalyzedContent:
+    return AnalyzedContent(content_type=ContentType.IMAGE, user_id="1", claims=claims or [],
+                           extracted_text=extracted_text)
+
+def test_stores_analysis_with_claims():
+    cache = MediaCache()
+    cache.store(make(claims=["La Terre est ronde"]), "file-1", "digest-1")
+    assert cache.lookup("file-1", "2").claims == ["La Terre est ronde"]
+    assert cache.lookup("digest-1", "2").user_id == "2"
+
+def test_skips_empty_analysis():
+    cache = MediaCache()
+    cache.store(make(), "file-1")
+    assert cache.lookup("file-1", "2") is None
+
+def test_memory_and_disk_digests_match(tmp_path):
+    data = b"\xff\xd8 contenu d'image" * 100
+    path = tmp_path / "image.jpg"
+    path.write_bytes(data)
+    assert data_digest(data) == asyncio.run(file_digest(path))
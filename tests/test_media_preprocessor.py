@@ -0,0 +1,103 @@
+import array
+import asyncio
+import io
+import stat
+
+from PIL import Image
+
+from config.settings import settings
+from services import media_preprocessor
+from services.media_preprocessor import _trim_silence, prepare_image, prepare_video
+
+def make_jpeg_with_gps() -> bytes:
+    """Petite JPEG déjà compacte, avec EXIF (appareil et position GPS)"""
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    exif[0x8825] = {1: "N", 2: (48.0, 51.0, 24.0), 3: "E", 4: (2.0, 21.0, 3.0)}  # GPSInfo
+    output = io.BytesIO()
+    # Bruit en basse qualité : le réencodage (qualité 82) est plus lourd que l'original
+    Image.effect_noise((64, 64), 80).convert("RGB").save(output, "JPEG", quality=10, exif=exif)
+    return output.getvalue()
+
+def test_prepared_image_has_no_exif():
+    data = make_jpeg_with_gps()
+    assert Image.open(io.BytesIO(data)).getexif()
+
+    part = asyncio.run(prepare_image(data))
+    assert len(part.data) > len(data)
+    assert part.mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(part.data)) as image:
+        assert not image.getexif()
+        assert "exif" not in image.info
+
+def fake_ffmpeg(tmp_path, script: str) -> str:
+    """Exécutable qui remplace ffmpeg (le dernier argument est le fichier de sortie)"""
+    path = tmp_path / "ffmpeg"
+    path.write_text("#!/bin/sh\nfor out; do :; done\n" + script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+def test_video_is_reduced_to_audio_and_keyframes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ffmpeg_path", fake_ffmpeg(tmp_path, """
+case "$out" in
+  *frame_*) dir=$(dirname "$out"); printf jpg1 > "$dir/frame_01.jpg"; printf jpg2 > "$dir/frame_02.jpg" ;;
+  *) printf ogg > "$out" ;;
+esac
+"""))
+    monkeypatch.setattr(settings, "ffprobe_path", str(tmp_path / "absent"))
+    monkeypatch.setattr(settings, "temp_download_path", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 100_000)
+
+    parts = asyncio.run(prepare_video(video))
+    assert [(part.mime_type, part.data) for part in parts] == [
+        ("audio/ogg", b"ogg"), ("image/jpeg", b"jpg1"), ("image/jpeg", b"jpg2")]
+
+def test_video_falls_back_to_original_when_ffmpeg_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ffmpeg_path", fake_ffmpeg(tmp_path, "echo 'Invalid data' >&2; exit 1\n"))
+    monkeypatch.setattr(settings, "temp_download_path", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\0" * 1000)
+    fallbacks = media_preprocessor.stats["video_fallbacks"]
+
+    assert asyncio.run(prepare_video(video)) is None
+    assert media_preprocessor.stats["video_fallbacks"] == fallbacks + 1
+
+def test_video_is_sent_as_is_without_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ffmpeg_path", str(tmp_path / "absent"))
+    assert asyncio.run(prepare_video(tmp_path / "video.mp4")) is None
+
+RATE = 16000
+
+def pcm(*segments: tuple[float, int]) -> bytes:
+    """PCM 16 bits mono : (durée en secondes, amplitude) ; amplitude 0 = silence"""
+    samples = array.array("h")
+    for seconds, amplitude in segments:
+        samples.extend(amplitude if i % 2 else -amplitude for i in range(int(seconds * RATE)))
+    return samples.tobytes()
+
+def seconds(data: bytes) -> float:
+    return len(data) / 2 / RATE
+
+def test_trim_silence_drops_edges_and_shortens_pauses():
+    audio = pcm((1.0, 0), (0.3, 3000), (2.0, 0), (0.3, 3000), (1.0, 0))
+    trimmed = _trim_silence(audio, RATE)
+
+    padding = settings.audio_vad_padding_ms / 1000
+    max_silence = settings.audio_max_silence_ms / 1000
+    # Parole conservée, marges autour, pause interne ramenée à max_silence
+    assert 0.6 <= seconds(trimmed) <= 0.6 + 4 * padding + max_silence + 0.1
+    samples = array.array("h", trimmed)
+    first_voiced = next(i for i, x in enumerate(samples) if x)
+    # Silence de début : la marge seule (à une trame de 30 ms près)
+    assert padding - 0.03 <= first_voiced / RATE <= padding + 0.03
+
+def test_trim_silence_keeps_audio_without_speech():
+    silence = pcm((1.0, 0)) + b"\0"
+    assert _trim_silence(silence, RATE) == silence
+    quiet = pcm((1.0, 50))
+    assert _trim_silence(quiet, RATE) == quiet
+
+def test_trim_silence_keeps_short_pauses():
+    audio = pcm((0.3, 3000), (0.2, 0), (0.3, 3000))
+    assert _trim_silence(audio, RATE) == audio
@@ -0,0 +1,22 @@
+from services.metrics import Metrics
+
+def test_reregistering_a_metric_replaces_it():
+    metrics = Metrics()
+    metrics.gauge("bot_gemini_waiting", "Appels en attente", (), lambda: {(): 0})
+    metrics.gauge("bot_gemini_waiting", "Appels en attente", (), lambda: {(): 3})
+    output = metrics.render()
+    assert output.count("# HELP bot_gemini_waiting ") == 1
+    assert "bot_gemini_waiting 3" in output
+
+def test_stage_records_duration_and_errors():
+    metrics = Metrics()
+    with metrics.stage("gemini", "texte"):
+        pass
+    try:
+        with metrics.stage("vera", "texte"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    output = metrics.render()
+    assert 'bot_stage_duration_seconds_count{stage="gemini",content_type="texte"} 1' in output
+    assert 'bot_errors_total{stage="vera",content_type="texte"} 1.0' in output
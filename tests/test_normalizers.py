@@ -0,0 +1,12 @@
+from utils.normalizers import normalize_claim
+
+def test_folds_case_accents_and_punctuation():
+    assert normalize_claim("« Le chômage » — en HAUSSE !") == normalize_claim("le chomage en hausse")
+
+def test_keeps_sign_and_comparisons():
+    assert normalize_claim("Il fait -5°C") != normalize_claim("Il fait 5°C")
+    assert normalize_claim("x > 40") != normalize_claim("x < 40")
+    assert normalize_claim("Le taux est de 7,3 %") != normalize_claim("Le taux est de 73")
+
+def test_hyphen_between_words_is_folded():
+    assert normalize_claim("COVID-19 est-il dangereux ?") == normalize_claim("covid 19 est il dangereux")
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_concurrent_calls_share_result():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "verdict"
+
+        results = await asyncio.gather(*(flight.do("k", fn) for _ in range(5)))
+        return results, calls, flight.get_stats()
+
+    results, calls, stats = run(scenario())
+    assert results == ["verdict"] * 5
+    assert len(calls) == 1
+    assert stats == {"calls": 1, "coalesced": 4, "inflight": 0}
+
+def test_exception_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            raise ValueError("boom")
+
+        return await asyncio.gather(*(flight.do("k", fn) for _ in range(3)), return_exceptions=True)
+
+    results = run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_cancelled_first_caller_does_not_cancel_waiters():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.1)
+            return "verdict"
+
+        first = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert run(scenario()) == "verdict"
+
+def test_timeout_of_first_caller_keeps_shared_call_running():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.1)
+            return "page"
+
+        first = asyncio.wait_for(flight.do("k", fn), timeout=0.02)
+        second = flight.do("k", fn)
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = run(scenario())
+    assert isinstance(first, asyncio.TimeoutError)
+    assert second == "page"
+
+def test_key_is_released_after_completion():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+
+        async def fn():
+            calls.append(1)
+            return len(calls)
+
+        return await flight.do("k", fn), await flight.do("k", fn)
+
+    assert run(scenario()) == (1, 2)
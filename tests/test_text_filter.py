@@ -0,0 +1,20 @@
+import pytest
+
+from utils.text_filter import prefilter_text
+
+@pytest.mark.parametrize("text", ["Salut !", "merci beaucoup", "ok 👍", "Bonne soirée le bot", "🙏"])
+def test_small_talk_is_a_greeting(text):
+    assert prefilter_text(text) == "greeting"
+
+@pytest.mark.parametrize("text", ["Bof nul", "trop drôle", "c'est faux"])
+def test_short_messages_without_fact_are_too_short(text):
+    assert prefilter_text(text) == "too_short"
+
+@pytest.mark.parametrize("text", ["Je trouve ce film vraiment très ennuyeux", "À mon avis c'est une mauvaise idée"])
+def test_opinions_are_filtered(text):
+    assert prefilter_text(text) == "opinion"
+
+@pytest.mark.parametrize("text", ["Macron démissionne", "L'OMS ment", "Poutine est mort", "TVA à 30%",
+                                  "Je trouve que le chômage a augmenté de 10 % selon l'INSEE"])
+def test_short_or_opinionated_claims_reach_gemini(text):
+    assert prefilter_text(text) is None
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from services import url_fetcher
+from services.url_fetcher import FetchError, UrlFetcher, is_public_address
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.1.2.3", "192.168.0.1", "169.254.169.254",
+                                     "0.0.0.0", "224.0.0.1", "::1", "fe80::1", "::ffff:127.0.0.1"])
+def test_internal_addresses_are_refused(address):
+    assert not is_public_address(address)
+
+@pytest.mark.parametrize("address", ["93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"])
+def test_public_addresses_are_allowed(address):
+    assert is_public_address(address)
+
+async def serve(location: str):
+    """Serveur local qui redirige toute requête vers `location`"""
+    async def handle(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(f"HTTP/1.1 302 Found\r\nLocation: {location}\r\nContent-Length: 0\r\n\r\n".encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+def test_original_url_is_requested():
+    targets = []
+
+    async def handle(reader, writer):
+        targets.append((await reader.readline()).split()[1].decode())
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        body = b"<p>Texte de la page</p>"
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n%s"
+                     % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = UrlFetcher(timeout=5, allow_private=True)
+        try:
+            return await fetcher.fetch(f"http://127.0.0.1:{port}/a?z=1&flag&utm_source=x")
+        finally:
+            await fetcher.close()
+            server.close()
+
+    page = asyncio.run(scenario())
+    assert targets == ["/a?z=1&flag&utm_source=x"]
+    assert page.text == "Texte de la page"
+
+def test_loopback_url_is_refused():
+    async def scenario():
+        fetcher = UrlFetcher(timeout=5)
+        try:
+            await fetcher.fetch("http://127.0.0.1:9100/metrics")
+        finally:
+            await fetcher.close()
+
+    with pytest.raises(FetchError, match="Adresse interne"):
+        asyncio.run(scenario())
+
+def test_redirect_to_internal_address_is_refused(monkeypatch):
+    # Seul 127.0.0.1 passe pour "public" : la redirection vers ::1 doit être bloquée
+    monkeypatch.setattr(url_fetcher, "is_public_address", lambda address: address == "127.0.0.1")
+
+    async def scenario():
+        server, port = await serve("http://[::1]:9100/metrics")
+        fetcher = UrlFetcher(timeout=5)
+        try:
+            await fetcher.fetch(f"http://127.0.0.1:{port}/article")
+        finally:
+            await fetcher.close()
+            server.close()
+
+    with pytest.raises(FetchError, match="Adresse interne"):
+        asyncio.run(scenario())
+
+def test_redirects_are_limited():
+    async def scenario():
+        server, port = await serve("/again")
+        fetcher = UrlFetcher(timeout=5, max_redirects=3, allow_private=True)
+        try:
+            await fetcher.fetch(f"http://127.0.0.1:{port}/start")
+        finally:
+            await fetcher.close()
+            server.close()
+
+    with pytest.raises(FetchError, match="TooManyRedirects"):
+        asyncio.run(scenario())
+
+def test_extracted_text_is_capped():
+    async def handle(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        body = b"<p>" + b"Une phrase de la page. " * 2000 + b"</p>"
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n%s"
+                     % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = UrlFetcher(timeout=5, max_chars=1000, allow_private=True)
+        try:
+            return await fetcher.fetch(f"http://127.0.0.1:{port}/long")
+        finally:
+            await fetcher.close()
+            server.close()
+
+    page = asyncio.run(scenario())
+    assert len(page.text) == 1000
+    assert page.truncated
+
+@pytest.mark.parametrize("address", ["100.64.0.1", "2002:7f00:1::1", "64:ff9b::7f00:1", "64:ff9b::a00:1"])
+def test_cgnat_and_wrapped_internal_addresses_are_refused(address):
+    assert not is_public_address(address)
+
+def test_connects_to_the_validated_address(monkeypatch):
+    # Résolveur qui change de réponse (DNS rebinding) : la première réponse doit être utilisée
+    answers = [["127.0.0.2"], ["127.0.0.1"]]
+    calls = []
+
+    async def resolve(host, port):
+        calls.append(host)
+        return answers[min(len(calls) - 1, 1)]
+
+    monkeypatch.setattr(url_fetcher, "_resolve", resolve)
+    monkeypatch.setattr(url_fetcher, "is_public_address", lambda address: address == "127.0.0.2")
+    hosts = []
+
+    async def handle(reader, writer):
+        await reader.readline()
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            if line.lower().startswith(b"host:"):
+                hosts.append(line.split(b":", 1)[1].strip().decode())
+        body = b"<p>Page publique</p>"
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n%s"
+                     % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, "127.0.0.2", 0)
+        port = server.sockets[0].getsockname()[1]
+        fetcher = UrlFetcher(timeout=5)
+        try:
+            return await fetcher.fetch(f"http://rebind.test:{port}/article"), port
+        finally:
+            await fetcher.close()
+            server.close()
+
+    page, port = asyncio.run(scenario())
+    assert page.text == "Page publique"
+    assert calls == ["rebind.test"]
+    assert hosts == [f"rebind.test:{port}"]
+
+def test_host_resolving_to_internal_address_is_refused(monkeypatch):
+    async def resolve(host, port):
+        return ["93.184.216.34", "10.0.0.5"]
+
+    monkeypatch.setattr(url_fetcher, "_resolve", resolve)
+
+    async def scenario():
+        fetcher = UrlFetcher(timeout=5)
+        try:
+            await fetcher.fetch("http://mixed.test/")
+        finally:
+            await fetcher.close()
+
+    with pytest.raises(FetchError, match="Adresse interne refusée pour mixed.test: 10.0.0.5"):
+        asyncio.run(scenario())
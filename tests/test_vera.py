@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.fake_services import FakeVeraAPI
+from services.telegram_service import ProgressiveEditor
+from services.vera_client import VeraClient
+
+def mock_client(handler) -> VeraClient:
+    """Client Vera dont les requêtes sont servies par `handler` (sans réseau)"""
+    client = VeraClient("http://vera.test/api/v1/chat", "key", http2=False)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+def test_claims_reuse_one_pooled_connection():
+    async def scenario():
+        vera = FakeVeraAPI(latency=0, jitter=0)
+        await vera.start()
+        client = VeraClient(vera.url, "key", http2=False)
+        try:
+            responses = [await client.verify_claim("1", query) for query in ("A", "B", "C")]
+        finally:
+            await client.close()
+            await vera.stop()
+        return client, responses
+
+    client, responses = asyncio.run(scenario())
+    assert all(response.success for response in responses)
+    stats = client.get_stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+
+def test_verify_claims_bounds_concurrency_and_keeps_order():
+    state = {"active": 0, "max_active": 0}
+
+    async def handler(request):
+        query = json.loads(request.content)["query"]
+        state["active"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        # Les premières affirmations répondent en dernier
+        await asyncio.sleep({"A": 0.06, "B": 0.04}.get(query, 0.01))
+        state["active"] -= 1
+        return httpx.Response(200, text=f"Verdict {query}")
+
+    client = mock_client(handler)
+    responses = asyncio.run(client.verify_claims("1", ["A", "B", "C", "D", "E"], max_concurrency=2))
+    assert [response.raw_response for response in responses] == [f"Verdict {q}" for q in "ABCDE"]
+    assert state["max_active"] == 2
+
+def test_failed_claim_does_not_fail_the_others():
+    async def handler(request):
+        if json.loads(request.content)["query"] == "B":
+            return httpx.Response(429)
+        return httpx.Response(200, text="ok")
+
+    responses = asyncio.run(mock_client(handler).verify_claims("1", ["A", "B", "C"]))
+    assert [response.success for response in responses] == [True, False, True]
+    assert responses[1].error_message == "Trop de requêtes"
+
+def test_stream_forwards_each_fragment_as_it_arrives():
+    async def body():
+        # "ô" coupé entre deux paquets : décodé sans caractère de remplacement
+        for part in (b"Plut", b"\xc3", b"\xb4t ", b"vrai"):
+            yield part
+
+    async def handler(request):
+        return httpx.Response(200, content=body())
+
+    deltas = []
+
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    response = asyncio.run(mock_client(handler).verify_claim("1", "A", on_delta))
+    assert response.raw_response == "Plutôt vrai"
+    assert "".join(deltas) == "Plutôt vrai"
+    assert len(deltas) > 1
+
+class RecordingMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text):
+        self.edits.append(text)
+
+def test_progressive_editor_limits_edit_rate():
+    message = RecordingMessage()
+    editor = ProgressiveEditor(message, "Résumé", "texte", ["A", "B"], min_interval=60)
+
+    async def scenario():
+        await editor.push(0, "Plutôt ")
+        await editor.push(0, "vrai")
+        await editor.push(1, "Faux")
+
+    asyncio.run(scenario())
+    assert len(message.edits) == 1
+    assert "Plutôt" in message.edits[0] and message.edits[0].endswith("⏳")
+    assert editor.parts == ["Plutôt vrai", "Faux"]
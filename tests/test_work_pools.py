@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from services.work_pools import PoolFullError, WorkPool
+
+def test_slot_reports_queue_position_then_rejects_when_full():
+    pool = WorkPool("video", concurrency=1, max_queue=2)
+    positions = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.slot():
+            await release.wait()
+
+    async def queued():
+        async def on_queued(position):
+            positions.append(position)
+
+        async with pool.slot(on_queued):
+            pass
+
+    async def scenario():
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(queued()) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.active == 1 and pool.waiting == 2
+
+        with pytest.raises(PoolFullError):
+            async with pool.slot():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+
+    asyncio.run(scenario())
+    assert positions == [1, 2]
+    assert pool.get_stats() == {"accepted": 3, "queued": 2, "rejected": 1, "active": 0, "waiting": 0,
+                                "concurrency": 1, "max_queue": 2}
+
+def test_slot_is_released_on_error():
+    pool = WorkPool("text", concurrency=1, max_queue=0)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            async with pool.slot():
+                raise RuntimeError("échec du traitement")
+        async with pool.slot():
+            pass
+
+    asyncio.run(scenario())
+    assert pool.stats["rejected"] == 0
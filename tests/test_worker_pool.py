@@ -0,0 +1,78 @@
+import asyncio
+import json
+import queue
+import sys
+import threading
+import time
+import types
+
+from config.settings import settings
+from services import worker_pool
+
+class FakeApplication:
+    """Application minimale : enregistre l'ordre de traitement des updates"""
+
+    def __init__(self):
+        self.bot = None
+        self.post_init = None
+        self.post_shutdown = None
+        self.processed = []
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def process_update(self, update):
+        # Le premier message de chaque chat est le plus lent
+        await asyncio.sleep(0.2 if update.message.message_id == 1 else 0.001)
+        self.processed.append((update.effective_chat.id, update.message.message_id))
+
+def make_update(update_id, chat_id, message_id):
+    return json.dumps({"update_id": update_id, "message": {
+        "message_id": message_id, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": "x"}})
+
+def test_worker_processes_each_chat_in_order(monkeypatch):
+    application = FakeApplication()
+    monkeypatch.setitem(sys.modules, "main", types.SimpleNamespace(
+        build_application=lambda with_updater: application))
+    monkeypatch.setattr(worker_pool, "setup_logger", lambda **kwargs: None)
+    monkeypatch.setattr(settings, "metrics_port", 0)
+    monkeypatch.setattr(settings, "trace_export_path", None)
+
+    updates = queue.Queue()
+    update_id = 0
+    for message_id in (1, 2, 3):
+        for chat_id in (100, 200):
+            update_id += 1
+            updates.put(make_update(update_id, chat_id, message_id))
+    updates.put(None)
+    ready = threading.Event()
+
+    started = time.monotonic()
+    asyncio.run(worker_pool._run_worker(0, updates, ready))
+    elapsed = time.monotonic() - started
+
+    assert ready.is_set()
+    for chat_id in (100, 200):
+        assert [m for c, m in application.processed if c == chat_id] == [1, 2, 3]
+    # Les deux chats avancent en parallèle (en série : au moins 2 x 200 ms)
+    assert elapsed < 0.35
+
+class FakeProcess:
+    def __init__(self, alive):
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+def test_wait_ready_detects_ready_dead_and_stuck_workers():
+    ready = threading.Event()
+    ready.set()
+    assert worker_pool.wait_ready(FakeProcess(alive=True), ready, timeout=5)
+
+    started = time.monotonic()
+    assert not worker_pool.wait_ready(FakeProcess(alive=False), threading.Event(), timeout=60)
+    assert not worker_pool.wait_ready(FakeProcess(alive=True), threading.Event(), timeout=0.1)
+    assert time.monotonic() - started < 3
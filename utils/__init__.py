@@ -2,22 +2,34 @@ from .logger import logger
 from .formatters import (
     format_fact_check_response,
     format_error_message,
-    format_processing_message
+    format_processing_message,
+    format_prefilter_message,
+    format_verdicts,
+    truncate_message
 )
 from .validators import (
     ValidationError,
     is_valid_url,
     extract_urls,
-    validate_file_size
+    validate_file_size,
+    validate_data_size
 )
+from .normalizers import normalize_claim
+from .text_filter import prefilter_text
 
 __all__ = [
     'logger',
     'format_fact_check_response',
     'format_error_message',
     'format_processing_message',
+    'format_prefilter_message',
+    'format_verdicts',
+    'truncate_message',
     'ValidationError',
     'is_valid_url',
     'extract_urls',
-    'validate_file_size'
+    'validate_file_size',
+    'validate_data_size',
+    'normalize_claim',
+    'prefilter_text'
 ]
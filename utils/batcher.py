@@ -0,0 +1,98 @@
+"""
+Micro-batching : regroupe des appels rapprochés en un seul traitement
+"""
+import asyncio
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Accumule les éléments soumis pendant une courte fenêtre (ou jusqu'à une
+    taille max) puis les traite ensemble
+
+    `handler` reçoit la liste des éléments et retourne une liste de résultats
+    de même longueur (un résultat peut être une exception, transmise au seul
+    appelant concerné).
+    """
+
+    def __init__(self, handler: Callable[[list[T]], Awaitable[list]], window_seconds: float,
+                 max_items: int):
+        """
+        Initialise le batcher
+
+        Args:
+            handler: Traitement d'un lot
+            window_seconds: Délai d'attente max avant envoi d'un lot incomplet
+            max_items: Taille max d'un lot
+        """
+        self.handler = handler
+        self.window_seconds = window_seconds
+        self.max_items = max(max_items, 1)
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"items": 0, "batches": 0, "max_batch": 0}
+
+    async def submit(self, item: T) -> R:
+        """
+        Ajoute un élément au lot courant et attend son résultat
+
+        Args:
+            item: Élément à traiter
+
+        Returns:
+            Résultat de cet élément
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.stats["items"] += 1
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        try:
+            try:
+                results = await self.handler([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"{len(results)} résultats pour {len(batch)} éléments")
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # Lot annulé (arrêt du bot...) : les appelants ne doivent pas attendre indéfiniment
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Lot interrompu avant son résultat"))
+
+    def get_stats(self) -> dict:
+        """Retourne le nombre d'éléments, de lots et la taille moyenne des lots"""
+        batches = self.stats["batches"]
+        return {**self.stats, "avg_batch": self.stats["items"] / batches if batches else 0.0}
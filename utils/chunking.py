@@ -0,0 +1,84 @@
+"""
+Découpage des textes longs en morceaux analysables séparément
+"""
+import re
+
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+def _units(text: str, max_chars: int) -> list[str]:
+    """Paragraphes, redécoupés en phrases (puis en mots) s'ils dépassent max_chars"""
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for sentence in SENTENCE_END.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                units.append(sentence)
+    return units
+
+def _tail(unit: str, max_chars: int) -> str:
+    """Fin d'une unité tenant dans max_chars : dernières phrases, sinon derniers mots entiers"""
+    tail = ""
+    for sentence in reversed(SENTENCE_END.split(unit)):
+        candidate = f"{sentence} {tail}" if tail else sentence
+        if len(candidate) > max_chars:
+            break
+        tail = candidate
+    if not tail and len(unit) > max_chars:
+        tail = unit[-max_chars:]
+        if not unit[-max_chars - 1].isspace():
+            # Premier mot coupé : on repart au mot suivant
+            words = tail.split(None, 1)
+            tail = words[1] if len(words) > 1 else ""
+    return tail.strip()
+
+def split_text(text: str, max_chars: int, overlap_chars: int = 0) -> list[str]:
+    """
+    Découpe un texte sur les limites de paragraphes et de phrases
+
+    Chaque morceau reprend la fin du précédent (jusqu'à `overlap_chars`) pour
+    ne pas couper une affirmation à cheval sur deux morceaux.
+
+    Args:
+        text: Texte à découper
+        max_chars: Taille max d'un morceau (hors recouvrement)
+        overlap_chars: Taille max du recouvrement entre morceaux consécutifs
+
+    Returns:
+        Morceaux dans l'ordre (le texte entier s'il est assez court)
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for unit in _units(text, max_chars):
+        if current and size + len(unit) > max_chars:
+            chunks.append("\n".join(current))
+            # Recouvrement : dernières unités du morceau précédent
+            overlap, overlap_size = [], 0
+            for previous in reversed(current):
+                if overlap_size + len(previous) > overlap_chars:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += len(previous) + 1
+            if not overlap and overlap_chars > 0:
+                # Dernière unité trop longue : on reprend sa fin (phrases ou mots)
+                tail = _tail(current[-1], overlap_chars)
+                overlap, overlap_size = ([tail], len(tail) + 1) if tail else ([], 0)
+            current, size = overlap, overlap_size
+        current.append(unit)
+        size += len(unit) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
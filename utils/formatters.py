@@ -3,6 +3,27 @@ Formatage des réponses pour Telegram
 """
 from typing import Optional
 
+from models.content import VeraResponse
+
+# Limite Telegram : 4096 caractères par message
+MAX_MESSAGE_LENGTH = 4096
+
+def truncate_message(text: str, max_length: int = MAX_MESSAGE_LENGTH, suffix: str = "…") -> str:
+    """
+    Coupe un message trop long pour Telegram
+    
+    Args:
+        text: Message complet
+        max_length: Longueur max (suffixe compris)
+        suffix: Marque ajoutée en fin de message coupé
+        
+    Returns:
+        Message d'au plus max_length caractères
+    """
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - len(suffix)] + suffix
+
 def format_fact_check_response(
     content_summary: str,
     vera_response: str,
@@ -41,7 +62,7 @@ def format_fact_check_response(
     # Affirmations détectées
     if claims:
         parts.append("🎯 *Affirmations :*\n")
-        for i, claim in enumerate(claims[:2], 1):  # Max 2 affirmations
+        for i, claim in enumerate(claims, 1):  # Déjà limitées par vera_max_claims (tous liens confondus)
             parts.append(f"{i}. _{claim}_\n")
         parts.append("\n")
     
@@ -50,6 +71,29 @@ def format_fact_check_response(
     
     return "".join(parts)
 
+def format_verdicts(vera_responses: list[VeraResponse]) -> str:
+    """
+    Fusionne les réponses Vera de plusieurs affirmations
+    
+    Args:
+        vera_responses: Réponses Vera, dans l'ordre des affirmations
+        
+    Returns:
+        Texte de vérification (numéroté si plusieurs affirmations)
+    """
+    
+    if len(vera_responses) == 1:
+        return vera_responses[0].raw_response
+    
+    parts = []
+    for i, vera_response in enumerate(vera_responses, 1):
+        if vera_response.is_valid():
+            parts.append(f"*{i}.* {vera_response.raw_response}")
+        else:
+            parts.append(f"*{i}.* ❌ Vérification indisponible")
+    
+    return "\n\n".join(parts)
+
 def format_error_message(error_type: str, details: Optional[str] = None) -> str:
     """
     Formate un message d'erreur convivial
@@ -67,6 +111,7 @@ def format_error_message(error_type: str, details: Optional[str] = None) -> str:
         "unsupported_format": "❌ Format non supporté",
         "vera_error": "❌ Service indisponible",
         "processing_error": "❌ Erreur de traitement",
+        "overloaded": "⏳ Bot surchargé, réessayez dans quelques minutes",
     }
     
     msg = errors.get(error_type, "❌ Erreur")
@@ -76,6 +121,25 @@ def format_error_message(error_type: str, details: Optional[str] = None) -> str:
     
     return msg
 
+def format_prefilter_message(reason: str) -> str:
+    """
+    Réponse immédiate à un message écarté par le pré-filtre
+    
+    Args:
+        reason: Raison du rejet (greeting, too_short, opinion)
+        
+    Returns:
+        Message formaté
+    """
+    
+    msgs = {
+        "greeting": "👋 Envoyez-moi une affirmation, une image, un audio ou un lien à vérifier.",
+        "too_short": "ℹ️ Message trop court pour contenir une affirmation vérifiable.",
+        "opinion": "ℹ️ Cela ressemble à une opinion personnelle : rien à vérifier.",
+    }
+    
+    return msgs.get(reason, "ℹ️ Aucune affirmation factuelle détectée")
+
 def format_processing_message(content_type: str) -> str:
     """
     Message indiquant que le traitement est en cours
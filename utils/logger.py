@@ -1,48 +1,118 @@
 """
 Configuration du système de logging
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from typing import Optional, TextIO
 from colorlog import ColoredFormatter
 
-def setup_logger(name: str = "telegram_bot", log_level: str = "INFO") -> logging.Logger:
+from utils.tracing import TraceIdFilter
+
+# Un thread d'écoute par logger configuré en mode file d'attente
+_listeners: dict[str, logging.handlers.QueueListener] = {}
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON compacte par enregistrement"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "trace_id": getattr(record, "trace_id", "-"),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+def _stop_listener(name: Optional[str] = None) -> None:
+    """Arrête le thread d'écoute d'un logger (de tous si name vaut None)"""
+    for key in [name] if name is not None else list(_listeners):
+        listener = _listeners.pop(key, None)
+        if listener is not None:
+            listener.stop()
+
+def setup_logger(name: str = "telegram_bot", log_level: str = "INFO", use_queue: bool = False,
+                 json_format: bool = False, max_bytes: int = 0, backup_count: int = 5,
+                 stream: Optional[TextIO] = None, log_dir: Path = Path("logs"),
+                 log_file: str = "bot.log") -> logging.Logger:
     """
     Configure un logger avec couleurs et formatage propre
-    
+
+    En mode file d'attente, le logger ne fait qu'empiler les enregistrements ;
+    un thread d'écoute les formate et les écrit (console + fichier), sans
+    I/O bloquante sur la boucle d'événements. Un nouvel appel remplace la
+    configuration précédente de ce logger.
+
     Args:
         name: Nom du logger
         log_level: Niveau de log
-        
+        use_queue: Écriture des logs dans un thread dédié
+        json_format: Une ligne JSON par enregistrement au lieu du texte
+        max_bytes: Taille max du fichier de log avant rotation (0 = pas de rotation)
+        backup_count: Nombre de fichiers conservés après rotation
+        stream: Flux console (stdout par défaut)
+        log_dir: Dossier du fichier de log
+        log_file: Nom du fichier de log (un par process : la rotation n'est pas partageable)
+
     Returns:
         Logger configuré
     """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper()))
-    
-    if logger.handlers:
-        return logger
-    
+
+    _stop_listener(name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
     # Handler console avec couleurs
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
     console_handler.setLevel(logging.DEBUG)
-    
+
     # Format avec couleurs
     console_formatter = ColoredFormatter(
-        "%(log_color)s%(asctime)s - %(levelname)s%(reset)s - %(message)s",
+        "%(log_color)s%(asctime)s - %(levelname)s%(reset)s - [%(trace_id)s] %(message)s",
         datefmt="%H:%M:%S",
         log_colors={'DEBUG': 'cyan', 'INFO': 'green', 'WARNING': 'yellow', 'ERROR': 'red'}
     )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
-    # Handler fichier (logs/)
-    log_dir = Path("logs")
+    console_handler.setFormatter(JsonFormatter() if json_format else console_formatter)
+
+    # Handler fichier (logs/), avec rotation par taille si demandée ; ouvert
+    # au premier enregistrement seulement (un process reconfiguré n'y touche pas)
+    log_dir = Path(log_dir)
     log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(log_dir / "bot.log", encoding="utf-8")
-    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-    logger.addHandler(file_handler)
-    
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(JsonFormatter() if json_format else
+                              logging.Formatter("%(asctime)s - %(levelname)s - [%(trace_id)s] %(message)s"))
+
+    if use_queue:
+        # Le filtre s'exécute dans le thread appelant : le trace ID y est encore visible
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(TraceIdFilter())
+        logger.addHandler(queue_handler)
+
+        listener = logging.handlers.QueueListener(queue_handler.queue, console_handler, file_handler,
+                                                  respect_handler_level=True)
+        listener.start()
+        _listeners[name] = listener
+    else:
+        console_handler.addFilter(TraceIdFilter())
+        file_handler.addFilter(TraceIdFilter())
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+
     return logger
 
-logger = setup_logger()
\ No newline at end of file
+atexit.register(_stop_listener)
+
+logger = setup_logger()
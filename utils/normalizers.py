@@ -0,0 +1,72 @@
+"""
+Normalisation de texte et d'URLs (clés de cache, déduplication)
+"""
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+def normalize_claim(text: str) -> str:
+    """
+    Normalise une affirmation pour servir de clé de cache
+    
+    Casse, accents, guillemets, tirets entre les mots et ponctuation de
+    phrase sont repliés : deux transferts du même message produisent la même
+    clé. Ce qui change le sens est conservé : symboles mathématiques
+    (< > = +), devises, %, signe moins devant un nombre et séparateur
+    décimal ("-5" et "5", "x > 40" et "x < 40" restent distincts).
+    
+    Args:
+        text: Affirmation brute
+        
+    Returns:
+        Forme normalisée
+    """
+    text = unicodedata.normalize("NFKD", text).casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    chars = []
+    for i, c in enumerate(text):
+        previous = text[i - 1] if i else ""
+        following = text[i + 1] if i + 1 < len(text) else ""
+        category = unicodedata.category(c)
+        if c == "\u2212":
+            chars.append("-")
+        elif category == "Pd":
+            # Signe moins devant un nombre, sinon tiret entre mots
+            chars.append("-" if following.isdigit() and not previous.isalnum() else " ")
+        elif c in ",." and previous.isdigit() and following.isdigit():
+            chars.append(c)
+        elif (category.startswith("P") and c != "%") or category in ("So", "Sk"):
+            chars.append(" ")
+        else:
+            chars.append(c)
+    return re.sub(r"\s+", " ", "".join(chars)).strip()
+
+# Paramètres de suivi sans effet sur le contenu de la page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "yclid", "msclkid", "mc_cid", "mc_eid",
+    "igshid", "si", "ref_src", "ref_url", "_ga", "_gl", "spm", "cmpid", "xtor",
+}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forme canonique d'une URL (clé de cache, déduplication)
+    
+    Schéma et hôte en minuscules, port par défaut, fragment et paramètres de
+    suivi (utm_*, fbclid, gclid...) retirés, paramètres restants triés.
+    
+    Args:
+        url: URL brute
+        
+    Returns:
+        URL canonique
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
@@ -0,0 +1,52 @@
+"""
+Coalescence des appels identiques en cours (single-flight)
+"""
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents ayant la même clé
+    
+    Le premier appel lance la fonction dans une tâche détachée ; tous les
+    appelants, tant qu'elle est en cours, attendent cette tâche et reçoivent
+    le même résultat (ou la même exception). L'annulation d'un appelant
+    n'interrompt que son attente : la tâche se termine pour les autres.
+    """
+    
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Exécute `fn` une seule fois par clé en cours
+        
+        Args:
+            key: Clé de déduplication (entrée normalisée)
+            fn: Fonction asynchrone à exécuter
+            
+        Returns:
+            Résultat partagé
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+    
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Évite "exception never retrieved" si tous les appelants sont partis
+    
+    def get_stats(self) -> dict:
+        """Retourne le nombre d'appels réels et coalescés"""
+        return {**self.stats, "inflight": len(self._inflight)}
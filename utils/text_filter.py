@@ -0,0 +1,90 @@
+"""
+Pré-filtre local des messages texte (sans réseau)
+
+Écarte avant Gemini les messages qui ne peuvent pas contenir d'affirmation
+vérifiable : salutations, remerciements, emojis seuls, messages très courts
+sans élément factuel ni nom propre, et opinions personnelles sans élément
+factuel.
+"""
+import re
+from typing import Optional
+
+from config.settings import settings
+from utils.normalizers import normalize_claim
+
+# Vocabulaire de politesse / réactions (forme normalisée : sans accents ni casse)
+SMALL_TALK_WORDS = {
+    "salut", "bonjour", "bonsoir", "coucou", "hello", "hi", "hey", "yo", "slt", "bjr", "cc",
+    "merci", "mercii", "beaucoup", "bcp", "thanks", "thank", "you", "thx", "ok", "okay", "oki",
+    "d", "accord", "dac", "oui", "non", "ouais", "yes", "no", "nope", "bye", "au", "revoir",
+    "a", "plus", "bientot", "bonne", "bon", "nuit", "journee", "soiree", "lol", "mdr", "ptdr",
+    "haha", "ahah", "hahaha", "top", "cool", "super", "parfait", "genial", "bravo", "nickel",
+    "ca", "va", "et", "toi", "vous", "comment", "allez", "tres", "bien", "le", "la", "bot",
+}
+
+# Débuts de phrase exprimant un avis personnel
+OPINION_PATTERNS = re.compile(
+    r"^(je (trouve|prefere|deteste|kiffe)|j (aime|adore|ai l impression)|"
+    r"a mon avis|perso|personnellement|selon moi|pour moi|c est (nul|genial|trop|vraiment|"
+    r"super|beau|moche|triste|dingue|ouf|incroyable)|quel(le)? (horreur|plaisir|honte)|"
+    r"i (think|feel|like|love|hate))\b"
+)
+
+# Indices factuels : chiffres, dates, sources... l'opinion est alors transmise
+FACTUAL_HINTS = re.compile(
+    r"\d|\b(selon|d apres|source|etude|rapport|chiffres?|pourcent|millions?|milliards?|"
+    r"gouvernement|president|ministre|loi|officiel|parce que|car)\b"
+)
+
+# Mots courants en début de phrase : leur majuscule ne signale pas un nom propre
+SENTENCE_STARTERS = {
+    "je", "j", "tu", "il", "elle", "on", "nous", "ils", "elles", "le", "les", "l", "un", "une",
+    "des", "du", "de", "ce", "c", "cette", "ces", "mon", "ma", "mes", "ton", "ta", "tes", "mais",
+    "donc", "alors", "si", "pas", "quoi", "pourquoi", "qui", "que", "quel", "quelle", "bof",
+    "trop", "vraiment", "tellement", "grave", "sinon", "voila", "enfin", "i", "it", "this",
+}
+
+WORDS = re.compile(r"[^\W\d_]+")
+
+def has_named_entity(text: str) -> bool:
+    """Indique si le texte contient un mot à majuscule hors mots courants (Macron, OMS, Paris...)"""
+    return any(word[0].isupper() and len(word) > 1
+               and normalize_claim(word) not in SMALL_TALK_WORDS | SENTENCE_STARTERS
+               for word in WORDS.findall(text))
+
+stats = {"checked": 0, "gemini_calls_avoided": 0, "greeting": 0, "too_short": 0, "opinion": 0}
+
+def prefilter_text(text: str) -> Optional[str]:
+    """
+    Classe un message texte sans appel réseau
+
+    Args:
+        text: Message reçu
+
+    Returns:
+        Raison du rejet ("greeting", "too_short", "opinion") ou None si le
+        message doit être analysé par Gemini
+    """
+    if not settings.text_prefilter_enabled:
+        return None
+
+    stats["checked"] += 1
+    normalized = normalize_claim(text)
+    words = normalized.split()
+
+    if not words or all(word in SMALL_TALK_WORDS for word in words):
+        reason = "greeting"
+    elif ((len(normalized) < settings.text_prefilter_min_chars
+           or len(words) < settings.text_prefilter_min_words)
+          # "Macron démissionne", "TVA à 30%" : courts mais vérifiables
+          and not (len(words) >= 2 and (FACTUAL_HINTS.search(normalized) or has_named_entity(text)))):
+        reason = "too_short"
+    elif (len(words) <= settings.text_prefilter_opinion_max_words
+          and OPINION_PATTERNS.match(normalized) and not FACTUAL_HINTS.search(normalized)):
+        reason = "opinion"
+    else:
+        return None
+
+    stats[reason] += 1
+    stats["gemini_calls_avoided"] += 1
+    return reason
@@ -0,0 +1,124 @@
+"""
+Traçage des updates (contextvars)
+
+Chaque update ouvre une trace ; les étapes (téléchargement, Gemini, Vera,
+édition Telegram...) y ajoutent des spans. L'identifiant de trace courant est
+ajouté à chaque ligne de log, et les spans terminés peuvent être exportés
+dans un fichier JSONL par un thread d'écriture.
+"""
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+@dataclass
+class Span:
+    """Étape mesurée d'une trace"""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float
+    duration: float = 0.0
+    status: str = "ok"
+    attributes: dict = field(default_factory=dict)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_trace_id() -> Optional[str]:
+    """Identifiant de la trace en cours (None hors d'une trace)"""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+class JsonlExporter:
+    """Écrit les spans terminés dans un fichier JSONL depuis un thread dédié"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                span = self._queue.get()
+                if span is None:
+                    break
+                f.write(json.dumps(asdict(span), ensure_ascii=False, default=str) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+class Tracer:
+    """Crée les spans et les transmet à l'exporteur configuré"""
+
+    def __init__(self):
+        self.exporter: Optional[JsonlExporter] = None
+
+    def configure(self, export_path: Optional[Path]) -> None:
+        """Active l'export JSONL (None = traces seulement dans les logs)"""
+        self.close()
+        if export_path:
+            self.exporter = JsonlExporter(export_path)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    @contextmanager
+    def span(self, name: str, new_trace: bool = False, **attributes) -> Iterator[Span]:
+        """
+        Ouvre un span enfant du span courant (ou une nouvelle trace)
+
+        Args:
+            name: Nom de l'étape
+            new_trace: Démarre une nouvelle trace même si un span est actif
+            **attributes: Attributs exportés avec le span
+        """
+        parent = None if new_trace else _current_span.get()
+        span = Span(
+            trace_id=parent.trace_id if parent else secrets.token_hex(8),
+            span_id=secrets.token_hex(4),
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            start=time.time(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+class TraceIdFilter(logging.Filter):
+    """Ajoute `trace_id` à chaque enregistrement de log"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id() or "-"
+        return True
+
+tracer = Tracer()
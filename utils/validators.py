@@ -70,6 +70,31 @@ def validate_file_size(file_path: Path, max_size_mb: int = None) -> bool:
     
     return True
 
+def validate_data_size(data: bytes, max_size_mb: int = None) -> bool:
+    """
+    Vérifie la taille d'un contenu téléchargé en mémoire
+    
+    Args:
+        data: Contenu du fichier
+        max_size_mb: Taille max en MB (None = utiliser settings)
+        
+    Returns:
+        True si taille acceptable
+        
+    Raises:
+        ValidationError si contenu trop gros
+    """
+    if max_size_mb is None:
+        max_size_mb = settings.max_file_size_mb
+    
+    if len(data) > max_size_mb * 1024 * 1024:
+        raise ValidationError(
+            f"Fichier trop volumineux: {len(data) / (1024*1024):.2f} MB "
+            f"(max: {max_size_mb} MB)"
+        )
+    
+    return True
+
 def get_mime_type(file_path: Path) -> str:
     """
     Détecte le type MIME d'un fichier